@@ -10,30 +10,64 @@ Usage:
     python chat_mcp.py --provider openai  # Use OpenAI
     python chat_mcp.py --provider ollama  # Use Ollama (local)
     python chat_mcp.py --provider hyperbolic  # Use Hyperbolic
+    python chat_mcp.py --provider openai --batch questions.txt  # Batch mode
 """
 
 import asyncio
+import hashlib
+import io
 import json
 import os
 import sys
+import time
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Sequence, Tuple
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 
-# Load environment variables
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    print("Warning: python-dotenv not installed. Using system environment variables.")
+
+@lru_cache(maxsize=1)
+def _load_env():
+    """Load environment variables from .env (read once per process)"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        print("Warning: python-dotenv not installed. Using system environment variables.")
+
+
+_load_env()
 
 # OpenAI client (compatible with OpenAI, Ollama, Hyperbolic)
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI
 except ImportError:
     print("ERROR: openai package not found. Install with: pip install openai>=1.0.0")
     sys.exit(1)
 
+# Fast JSON (optional): orjson is 2-5x faster than stdlib json on tool payloads
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj: Any, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj: Any, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False)
+
+# Line editing, history and bracketed paste for the REPL (optional)
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+except ImportError:
+    PromptSession = None
+
 # MCP imports
 try:
     from mcp import ClientSession, StdioServerParameters
@@ -48,7 +82,7 @@ except ImportError:
 # Configuration Management
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProviderConfig:
     """Configuration for an LLM provider"""
     name: str
@@ -58,12 +92,14 @@ class ProviderConfig:
     supports_streaming: bool = True
     supports_tools: bool = True
     supports_streaming_tools: bool = True  # Some providers don't stream tool calls properly
+    supports_parallel_tool_calls: bool = False  # OpenAI "parallel_tool_calls" parameter
 
 
 class ConfigManager:
     """Manages configuration for multiple LLM providers"""
     
     def __init__(self):
+        _load_env()
         self.providers: Dict[str, ProviderConfig] = {}
         self._load_providers()
     
@@ -80,7 +116,8 @@ class ConfigManager:
                 name="OpenAI",
                 api_key=openai_key,
                 base_url=openai_base,
-                model=openai_model
+                model=openai_model,
+                supports_parallel_tool_calls=True
             )
         
         # Ollama (local, no API key needed)
@@ -119,7 +156,7 @@ class ConfigManager:
     
     def select_provider_interactive(self) -> Optional[str]:
         """Interactive provider selection"""
-        providers = self.list_providers()
+        providers = list(self.providers.items())
         
         if not providers:
             print("❌ No providers configured. Please check your .env file.")
@@ -129,8 +166,7 @@ class ConfigManager:
         print("🤖 Available LLM Providers")
         print("=" * 80)
         
-        for i, provider_id in enumerate(providers, 1):
-            config = self.providers[provider_id]
+        for i, (_, config) in enumerate(providers, 1):
             print(f"{i}. {config.name} ({config.model})")
         
         print("=" * 80)
@@ -141,8 +177,8 @@ class ConfigManager:
                 idx = int(choice) - 1
                 
                 if 0 <= idx < len(providers):
-                    selected = providers[idx]
-                    print(f"✅ Selected: {self.providers[selected].name}")
+                    selected, config = providers[idx]
+                    print(f"✅ Selected: {config.name}")
                     return selected
                 else:
                     print(f"❌ Invalid choice. Please enter 1-{len(providers)}")
@@ -153,10 +189,22 @@ class ConfigManager:
                 return None
 
 
+@lru_cache(maxsize=1)
+def get_config_manager() -> ConfigManager:
+    """Return the process-wide ConfigManager (environment parsed once)"""
+    return ConfigManager()
+
+
 # ============================================================================
 # MCP Client
 # ============================================================================
 
+# Tool listings and OpenAI-formatted schemas, keyed by (server script path, mtime)
+_TOOLS_CACHE: Dict[Tuple[str, float], List[Tool]] = {}
+_SCHEMA_CACHE: Dict[Tuple[str, float], Tuple[Dict[str, Any], ...]] = {}
+_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
 class MCPClient:
     """Client for interacting with MCP server"""
     
@@ -165,15 +213,19 @@ class MCPClient:
         self.session: Optional[ClientSession] = None
         self.tools: List[Tool] = []
         self.tools_dict: Dict[str, Tool] = {}
+        self._server_script: Optional[Path] = None
+        self._openai_tools: Tuple[Dict[str, Any], ...] = ()
     
-    async def connect(self):
-        """Connect to the MCP server"""
+    @cached_property
+    def server_params(self) -> StdioServerParameters:
+        """Server launch parameters, resolved and validated once per client"""
         # Get absolute path to run_mcp_server.py
-        root = Path(__file__).parent
+        root = Path(__file__).parent.resolve()
         server_script = root / "run_mcp_server.py"
         
         if not server_script.exists():
             raise FileNotFoundError(f"MCP server script not found: {server_script}")
+        self._server_script = server_script
         
         # Check if database exists
         db_full_path = root / self.db_path
@@ -181,31 +233,63 @@ class MCPClient:
             raise FileNotFoundError(f"Database not found: {db_full_path}")
         
         # Configure server parameters
-        server_params = StdioServerParameters(
+        return StdioServerParameters(
             command=sys.executable,  # Use current Python interpreter
-            args=[str(server_script)],
+            args=[os.fspath(server_script)],
             env={
-                "EASA_DB_PATH": str(db_full_path),
+                "EASA_DB_PATH": os.fspath(db_full_path),
                 "EASA_MODEL": os.getenv("EASA_MODEL", "all-MiniLM-L6-v2"),
+                "EASA_ENCODE_BACKEND": os.getenv("EASA_ENCODE_BACKEND", "torch"),
                 "EASA_MAX_RESULTS": os.getenv("EASA_MAX_RESULTS", "20"),
                 "EASA_CACHE": os.getenv("EASA_CACHE", "true")
             }
         )
-        
-        return server_params
+    
+    async def connect(self):
+        """Connect to the MCP server"""
+        return self.server_params
     
     async def initialize(self, session: ClientSession):
         """Initialize the MCP session and load tools"""
         self.session = session
         await self.session.initialize()
         
-        # Load available tools
-        tools_response = await self.session.list_tools()
-        self.tools = tools_response.tools
+        # Load available tools (reused while the server script is unchanged)
+        cache_key = self._cache_key()
+        if cache_key is not None and cache_key in _TOOLS_CACHE:
+            _CACHE_STATS["hits"] += 1
+            self.tools = _TOOLS_CACHE[cache_key]
+            self._openai_tools = _SCHEMA_CACHE[cache_key]
+        else:
+            _CACHE_STATS["misses"] += 1
+            tools_response = await self.session.list_tools()
+            self.tools = tools_response.tools
+            # self.tools is immutable after init: build the OpenAI schema once,
+            # frozen so downstream code cannot mutate the shared list
+            self._openai_tools = tuple(
+                {
+                    "type": "function",
+                    "function": {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": tool.inputSchema
+                    }
+                }
+                for tool in self.tools
+            )
+            if cache_key is not None:
+                _TOOLS_CACHE[cache_key] = self.tools
+                _SCHEMA_CACHE[cache_key] = self._openai_tools
         self.tools_dict = {tool.name: tool for tool in self.tools}
         
         print(f"✅ Connected to MCP server: {len(self.tools)} tools available", file=sys.stderr)
     
+    def _cache_key(self) -> Optional[Tuple[str, float]]:
+        """Cache key for the tool listing: server script path and modification time"""
+        if self._server_script is None:
+            return None
+        return str(self._server_script), self._server_script.stat().st_mtime
+    
     async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
         """Call an MCP tool and return the result"""
         if not self.session:
@@ -213,47 +297,48 @@ class MCPClient:
         
         result = await self.session.call_tool(name, arguments)
         
-        # Extract text content from result
+        # Extract text content from result (a tool may return several TextContent parts)
         if result.content:
-            return result.content[0].text
+            return "".join(c.text for c in result.content if getattr(c, "text", None))
         return "{}"
     
-    def get_tools_for_llm(self) -> List[Dict[str, Any]]:
-        """Convert MCP tools to OpenAI function format"""
-        openai_tools = []
-        
-        for tool in self.tools:
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.inputSchema
-                }
-            })
-        
-        return openai_tools
+    def get_tools_for_llm(self) -> Tuple[Dict[str, Any], ...]:
+        """Return MCP tools in OpenAI function format (built once at initialize)"""
+        return self._openai_tools
 
 
 # ============================================================================
 # LLM Client
 # ============================================================================
 
+# Connection pool shared by every request of the process (keeps TCP+TLS warm)
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
 class UnifiedLLMClient:
     """Unified client for OpenAI-compatible APIs"""
     
     def __init__(self, config: ProviderConfig):
         self.config = config
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=config.api_key,
-            base_url=config.base_url
+            base_url=config.base_url,
+            timeout=HTTP_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
         )
     
-    def chat_completion(
+    async def close(self):
+        """Close the underlying HTTP connection pool"""
+        await self.client.close()
+    
+    async def chat_completion(
         self,
         messages: List[Dict[str, Any]],
-        tools: Optional[List[Dict[str, Any]]] = None,
-        stream: bool = True
+        tools: Optional[Sequence[Dict[str, Any]]] = None,
+        stream: bool = True,
+        response_format: Optional[Dict[str, str]] = None,
+        tool_choice: Optional[str] = "auto"
     ) -> Any:
         """
         Send a chat completion request with optional tool support.
@@ -262,9 +347,11 @@ class UnifiedLLMClient:
             messages: List of chat messages
             tools: Optional list of tools in OpenAI format
             stream: Whether to stream the response
+            response_format: Optional response format (e.g. {"type": "json_object"})
+            tool_choice: "auto" to let the model call tools, "none" to force a text answer
         
         Returns:
-            Streaming or non-streaming response
+            AsyncStream or non-streaming response
         """
         # Disable streaming if provider doesn't support streaming tools and we have tools
         if tools and not self.config.supports_streaming_tools:
@@ -278,15 +365,236 @@ class UnifiedLLMClient:
         
         if tools and self.config.supports_tools:
             kwargs["tools"] = tools
-            kwargs["tool_choice"] = "auto"
+            kwargs["tool_choice"] = tool_choice or "auto"
+            if kwargs["tool_choice"] != "none" and self.config.supports_parallel_tool_calls:
+                kwargs["parallel_tool_calls"] = True
+        
+        if response_format:
+            kwargs["response_format"] = response_format
+        
+        return await self.client.chat.completions.create(**kwargs)
+
+
+# ============================================================================
+# Response Dispatchers
+# ============================================================================
+
+class _FlushBuffer:
+    """
+    Batch streamed tokens into fewer stdout writes.
+    
+    Flushes when the pending output exceeds max_bytes or when interval seconds
+    have elapsed since the last flush - imperceptible latency, far fewer syscalls
+    than one print(flush=True) per token.
+    """
+    
+    def __init__(self, interval: float = 0.03, max_bytes: int = 256):
+        self._stream = sys.stdout
+        self._raw = getattr(sys.stdout, "buffer", None)
+        self._encoding = getattr(sys.stdout, "encoding", None) or "utf-8"
+        self._interval = interval
+        self._max_bytes = max_bytes
+        self._pending: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+    
+    def write(self, text: str):
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self._max_bytes or time.monotonic() - self._last_flush > self._interval:
+            self.flush()
+    
+    def flush(self):
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._size = 0
+            if self._raw is not None:
+                self._stream.flush()  # Keep ordering with text written through print()
+                self._raw.write(text.encode(self._encoding, errors="replace"))
+                self._raw.flush()
+            else:
+                self._stream.write(text)
+                self._stream.flush()
+        self._last_flush = time.monotonic()
+
+
+class _ResponseDispatcher(ABC):
+    """
+    Request options and response parsing for one provider.
+    
+    Provider capabilities are stable for a session, so the strategy is chosen once
+    in ChatMCPApp.__init__ and each loop iteration runs straight-line code.
+    """
+    
+    stream = False
+    
+    def build_kwargs(self, tools: Sequence[Dict[str, Any]], has_used_tools: bool) -> Dict[str, Any]:
+        """Build chat_completion arguments for one iteration"""
+        # After tools are used once, keep the same schema but force a text response
+        # with tool_choice="none". This helps models that struggle with the
+        # tool->response transition without re-serialising a different request shape
+        return {
+            "tools": tools,
+            "stream": self.stream,
+            "tool_choice": "none" if has_used_tools else "auto"
+        }
+    
+    @abstractmethod
+    async def parse_response(self, response: Any) -> Dict[str, Any]:
+        """Print the assistant output and return it as an assistant message"""
+
+
+class _StreamingToolDispatcher(_ResponseDispatcher):
+    """Providers that stream both content and tool calls"""
+    
+    stream = True
+    
+    async def parse_response(self, response: Any) -> Dict[str, Any]:
+        assistant_message = {"role": "assistant", "content": "", "tool_calls": []}
+        
+        # Streaming mode: accumulate deltas in buffers, joined once at stream end
+        out = _FlushBuffer()
+        content_buf = io.StringIO()
+        tool_arg_bufs: Dict[int, io.StringIO] = {}
+        tool_meta: Dict[int, Dict[str, str]] = {}
+        
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            
+            choice = chunk.choices[0]
+            delta = choice.delta
+            
+            # Handle content
+            if delta.content:
+                out.write(delta.content)
+                content_buf.write(delta.content)
+            
+            # Handle tool calls
+            if delta.tool_calls:
+                for tc_chunk in delta.tool_calls:
+                    idx = tc_chunk.index
+                    if idx is None:
+                        continue
+                    
+                    # New tool call or continuation
+                    meta = tool_meta.setdefault(idx, {"id": "", "name": ""})
+                    arg_buf = tool_arg_bufs.setdefault(idx, io.StringIO())
+                    
+                    if tc_chunk.id:
+                        meta["id"] = tc_chunk.id
+                    if tc_chunk.function:
+                        if tc_chunk.function.name:
+                            meta["name"] = tc_chunk.function.name
+                        if tc_chunk.function.arguments:
+                            arg_buf.write(tc_chunk.function.arguments)
         
-        return self.client.chat.completions.create(**kwargs)
+        out.flush()
+        assistant_message["content"] = content_buf.getvalue()
+        assistant_message["tool_calls"] = [
+            {
+                "id": tool_meta[idx]["id"],
+                "type": "function",
+                "function": {
+                    "name": tool_meta[idx]["name"],
+                    "arguments": tool_arg_bufs[idx].getvalue()
+                }
+            }
+            for idx in sorted(tool_meta)
+        ]
+        
+        return assistant_message
+
+
+class _NonStreamingDispatcher(_ResponseDispatcher):
+    """Providers that cannot stream (tool calls), e.g. Hyperbolic"""
+    
+    async def parse_response(self, response: Any) -> Dict[str, Any]:
+        assistant_message = {"role": "assistant", "content": "", "tool_calls": []}
+        
+        # Non-streaming mode
+        if response.choices:
+            choice = response.choices[0]
+            message = choice.message
+            
+            # Handle content
+            if message.content:
+                print(message.content, end="", flush=True)
+                assistant_message["content"] = message.content
+            
+            # Handle tool calls
+            if message.tool_calls:
+                assistant_message["tool_calls"] = []
+                for tc in message.tool_calls:
+                    assistant_message["tool_calls"].append({
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.function.name,
+                            "arguments": tc.function.arguments
+                        }
+                    })
+        
+        return assistant_message
+
+
+class _StreamingAnswerDispatcher(_NonStreamingDispatcher):
+    """Providers that stream text but not tool calls: only the final answer is streamed"""
+    
+    _stream_parser = _StreamingToolDispatcher()
+    
+    def build_kwargs(self, tools: Sequence[Dict[str, Any]], has_used_tools: bool) -> Dict[str, Any]:
+        if not has_used_tools:
+            return super().build_kwargs(tools, has_used_tools)
+        # Final answer: no tools in the request, so chat_completion keeps it streamed
+        return {"tools": None, "stream": True, "tool_choice": "none"}
+    
+    async def parse_response(self, response: Any) -> Dict[str, Any]:
+        # A complete response has choices, a stream is iterated chunk by chunk
+        if hasattr(response, "choices"):
+            return await super().parse_response(response)
+        return await self._stream_parser.parse_response(response)
 
 
 # ============================================================================
 # Main Chat Application
 # ============================================================================
 
+_BATCH_INSTRUCTIONS = (
+    "Answer each numbered item below independently. "
+    "Return a JSON object of the form "
+    '{"answers": [{"id": <item number>, "answer": "<answer>"}, ...]} '
+    "with exactly one entry per item.\n"
+)
+
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "You are an expert assistant for EASA (European Union Aviation Safety Agency) regulations. "
+        "You have access to tools to search and retrieve EASA regulations. "
+        "Use these tools when needed to provide accurate, regulation-backed answers. "
+        "Always cite specific regulation references when available. "
+        "After using tools to gather information, provide a clear and complete answer to the user's question."
+    )
+}
+
+# Final answers cache (diskcache when installed, in-memory otherwise)
+RESPONSE_CACHE_DIR = Path("~/.cache/easa-chat").expanduser()
+
+
+def _open_response_cache():
+    """Open the LLM response cache"""
+    try:
+        import diskcache
+        return diskcache.Cache(os.fspath(RESPONSE_CACHE_DIR))
+    except ImportError:
+        return {}
+
+
+# Pretty-print tool arguments only when a human is watching stderr
+_PRETTY_TOOL_ARGS = sys.stderr.isatty()
+
 class ChatMCPApp:
     """Main chat application with MCP integration"""
     
@@ -301,9 +609,31 @@ class ChatMCPApp:
         self.llm_client = UnifiedLLMClient(self.provider_config)
         self.mcp_client = MCPClient()
         self.running = False
+        
+        # Some providers don't support streaming tool calls even if they support regular streaming
+        if not self.provider_config.supports_streaming:
+            self._dispatch: _ResponseDispatcher = _NonStreamingDispatcher()
+        elif self.provider_config.supports_streaming_tools:
+            self._dispatch = _StreamingToolDispatcher()
+        else:
+            self._dispatch = _StreamingAnswerDispatcher()
+        self.use_cache = True
+        self._response_cache = _open_response_cache()
     
-    async def start(self):
-        """Start the chat application"""
+    def _response_cache_key(self, messages: List[Dict[str, Any]]) -> str:
+        """Content-addressed key for (provider, model, messages)"""
+        payload = _dumps([self.provider_id, self.provider_config.model, messages])
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    async def start(self, batch_queries: Optional[List[str]] = None, batch_size: int = 10):
+        """
+        Start the chat application.
+        
+        Args:
+            batch_queries: If given, answer these queries in batches instead of
+                           starting the interactive loop
+            batch_size: Number of queries sent per LLM prompt in batch mode
+        """
         print("\n" + "=" * 80)
         print("🚀 MCP Chat Client - EASA Regulations")
         print("=" * 80)
@@ -315,16 +645,26 @@ class ChatMCPApp:
         print("\n🔌 Connecting to MCP server...", file=sys.stderr)
         server_params = await self.mcp_client.connect()
         
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await self.mcp_client.initialize(session)
-                
-                # Show available commands
-                self.print_help()
-                
-                # Start interactive loop
-                self.running = True
-                await self.interactive_loop()
+        try:
+            async with stdio_client(server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await self.mcp_client.initialize(session)
+                    
+                    if batch_queries is not None:
+                        answers = await self.process_batch(batch_queries, batch_size)
+                        for i, (query, answer) in enumerate(zip(batch_queries, answers), 1):
+                            print(f"\n[{i}] You: {query}")
+                            print(f"Assistant: {answer}")
+                        return
+                    
+                    # Show available commands
+                    self.print_help()
+                    
+                    # Start interactive loop
+                    self.running = True
+                    await self.interactive_loop()
+        finally:
+            await self.llm_client.close()
     
     def print_help(self):
         """Print help message"""
@@ -333,15 +673,30 @@ class ChatMCPApp:
         print("  /quit, /exit - Exit the chat")
         print("  /provider    - Change LLM provider")
         print("  /tools       - List available MCP tools")
+        print("  /cache_stats - Show MCP tool cache statistics")
+        print("  /nocache     - Toggle the LLM response cache")
+        print("  /clearcache  - Clear the LLM response cache")
         print("  /help        - Show this help")
         print("-" * 80 + "\n")
     
     async def interactive_loop(self):
         """Main interactive loop"""
+        prompt = (
+            PromptSession(history=FileHistory(os.path.expanduser("~/.easa_chat_history")))
+            if PromptSession is not None else None
+        )
+        
         while self.running:
             try:
-                # Get user input
-                user_input = input("You: ").strip()
+                # Get user input without blocking the event loop so MCP I/O keeps flowing
+                # (prompt_toolkit is natively async and buffers multi-line pastes)
+                if prompt is not None:
+                    user_input = await prompt.prompt_async(
+                        "You: ", multiline=False, enable_open_in_editor=True
+                    )
+                else:
+                    user_input = await asyncio.to_thread(input, "You: ")
+                user_input = user_input.strip()
                 
                 if not user_input:
                     continue
@@ -353,8 +708,10 @@ class ChatMCPApp:
                 
                 # Process user query with LLM
                 await self.process_query(user_input)
-                
-            except KeyboardInterrupt:
+            
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                # Under asyncio.run, Ctrl-C while awaiting input() in a thread
+                # cancels the main task instead of raising KeyboardInterrupt
                 print("\n\n👋 Goodbye!")
                 self.running = False
             except Exception as e:
@@ -377,6 +734,21 @@ class ChatMCPApp:
                 print(f"  • {tool.name}: {tool.description}")
             print()
         
+        elif cmd == "/cache_stats":
+            print("\n📊 MCP tool cache:")
+            print(f"  • Hits: {_CACHE_STATS['hits']}")
+            print(f"  • Misses: {_CACHE_STATS['misses']}")
+            print(f"  • Cached servers: {len(_TOOLS_CACHE)}")
+            print()
+        
+        elif cmd == "/nocache":
+            self.use_cache = not self.use_cache
+            print(f"\n💾 Response cache {'enabled' if self.use_cache else 'disabled'}")
+        
+        elif cmd == "/clearcache":
+            self._response_cache.clear()
+            print("\n🧹 Response cache cleared")
+        
         elif cmd == "/help":
             self.print_help()
         
@@ -384,20 +756,121 @@ class ChatMCPApp:
             print(f"❌ Unknown command: {command}")
             print("   Type /help for available commands")
     
+    def _validate_tool_calls(
+        self,
+        tool_calls: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Keep only complete tool calls with valid JSON arguments.
+        
+        Returns:
+            (valid tool calls, parsed arguments) - parsed arguments are kept aside,
+            not on the message sent back to the API
+        """
+        valid_tool_calls = []
+        tool_args_list = []
+        for tc in tool_calls:
+            # A valid tool call must have id, name, and valid JSON arguments
+            if tc["id"] and tc["function"]["name"] and tc["function"]["arguments"]:
+                try:
+                    # Verify arguments are valid JSON (parsed once, reused on execution)
+                    parsed_args = _loads(tc["function"]["arguments"])
+                    valid_tool_calls.append(tc)
+                    tool_args_list.append(parsed_args)
+                except json.JSONDecodeError:
+                    # Skip invalid JSON silently
+                    pass
+        return valid_tool_calls, tool_args_list
+    
+    async def _execute_tool_calls(
+        self,
+        messages: List[Dict[str, Any]],
+        assistant_message: Dict[str, Any],
+        valid_tool_calls: List[Dict[str, Any]],
+        tool_args_list: List[Dict[str, Any]]
+    ):
+        """Record the assistant tool calls, run them and append their results to messages"""
+        # Update the message with only valid tool calls
+        assistant_message["tool_calls"] = valid_tool_calls
+        
+        # For providers that don't support proper tool protocol, use a workaround
+        if not self.provider_config.supports_streaming_tools:
+            # Don't add assistant message with tool_calls, use regular text instead
+            messages.append({
+                "role": "assistant",
+                "content": "Let me search for that information..."
+            })
+        else:
+            # Add assistant message to history (with tool calls, content should be empty)
+            # Different providers handle this differently:
+            # - OpenAI: accepts None or no field
+            # - Hyperbolic: seems to require empty string or the field present
+            if assistant_message["tool_calls"]:
+                if not assistant_message["content"]:
+                    assistant_message["content"] = ""  # Use empty string instead of None
+            
+            messages.append(assistant_message)
+        
+        # Execute tool calls
+        print("\n🔧 Executing tool calls...", file=sys.stderr)
+        
+        # Dispatch all independent calls concurrently
+        for tool_call, tool_args in zip(valid_tool_calls, tool_args_list):
+            print(f"   • {tool_call['function']['name']}({_dumps(tool_args, pretty=_PRETTY_TOOL_ARGS)})", file=sys.stderr)
+        
+        results = await asyncio.gather(
+            *(
+                self.mcp_client.call_tool(tool_call["function"]["name"], tool_args)
+                for tool_call, tool_args in zip(valid_tool_calls, tool_args_list)
+            ),
+            return_exceptions=True
+        )
+        
+        # Append results in the original order to keep tool_call_id pairing
+        for tool_call, result in zip(valid_tool_calls, results):
+            tool_name = tool_call["function"]["name"]
+            
+            if not isinstance(result, BaseException):
+                # Add tool result to messages
+                # Some providers (like Hyperbolic) don't properly support role="tool"
+                # so we use role="user" as a workaround for those providers
+                if self.provider_config.supports_streaming_tools:
+                    # Provider properly supports tool protocol
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": result
+                    })
+                else:
+                    # Workaround: convert tool result to user message
+                    messages.append({
+                        "role": "user",
+                        "content": f"Tool '{tool_name}' result:\n{result}"
+                    })
+                
+                print(f"   ✅ {tool_name} completed", file=sys.stderr)
+            
+            else:
+                print(f"   ❌ {tool_name} failed: {result}", file=sys.stderr)
+                error_content = _dumps({"error": str(result)})
+                
+                if self.provider_config.supports_streaming_tools:
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": error_content
+                    })
+                else:
+                    messages.append({
+                        "role": "user",
+                        "content": f"Tool '{tool_name}' error:\n{error_content}"
+                    })
+    
     async def process_query(self, user_query: str):
         """Process a user query with the LLM and handle tool calls"""
         # Initial messages
         messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert assistant for EASA (European Union Aviation Safety Agency) regulations. "
-                    "You have access to tools to search and retrieve EASA regulations. "
-                    "Use these tools when needed to provide accurate, regulation-backed answers. "
-                    "Always cite specific regulation references when available. "
-                    "After using tools to gather information, provide a clear and complete answer to the user's question."
-                )
-            },
+            _SYSTEM_MESSAGE,
             {
                 "role": "user",
                 "content": user_query
@@ -415,184 +888,44 @@ class ChatMCPApp:
         while iteration < max_iterations:
             iteration += 1
             
-            # After tools are used once, we can optionally remove them to force a text response
-            # This helps models that struggle with the tool->response transition
-            current_tools = None if has_used_tools else tools
-            
-            # Determine if we should use streaming
-            use_streaming = self.provider_config.supports_streaming
-            
-            # Some providers don't support streaming tool calls even if they support regular streaming
-            if current_tools and not self.provider_config.supports_streaming_tools:
-                use_streaming = False
+            request_kwargs = self._dispatch.build_kwargs(tools, has_used_tools)
             
+            # Only the forced-text step is deterministic enough to cache: the messages
+            # (tool results included) fully determine the answer
+            cache_key = None
+            if request_kwargs["tool_choice"] == "none" and self.use_cache:
+                cache_key = self._response_cache_key(messages)
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    print(f"\nAssistant: {cached}")
+                    print("   (cached response)", file=sys.stderr)
+                    break
             
             # Call LLM
-            response = self.llm_client.chat_completion(
-                messages=messages,
-                tools=current_tools,
-                stream=use_streaming
-            )
+            response = await self.llm_client.chat_completion(messages=messages, **request_kwargs)
             
             # Process response (streaming or non-streaming)
-            assistant_message = {"role": "assistant", "content": "", "tool_calls": []}
-            current_tool_call = None
             print("\nAssistant: ", end="", flush=True)
-            
-            if use_streaming:
-                # Streaming mode
-                for chunk in response:
-                    if not chunk.choices:
-                        continue
-                    
-                    choice = chunk.choices[0]
-                    delta = choice.delta
-                    
-                    # Handle content
-                    if delta.content:
-                        print(delta.content, end="", flush=True)
-                        assistant_message["content"] += delta.content
-                    
-                    # Handle tool calls
-                    if delta.tool_calls:
-                        for tc_chunk in delta.tool_calls:
-                            if tc_chunk.index is not None:
-                                # New tool call or continuation
-                                while len(assistant_message["tool_calls"]) <= tc_chunk.index:
-                                    assistant_message["tool_calls"].append({
-                                        "id": "",
-                                        "type": "function",
-                                        "function": {"name": "", "arguments": ""}
-                                    })
-                                
-                                current_tool_call = assistant_message["tool_calls"][tc_chunk.index]
-                                
-                                if tc_chunk.id:
-                                    current_tool_call["id"] = tc_chunk.id
-                                if tc_chunk.function:
-                                    if tc_chunk.function.name:
-                                        current_tool_call["function"]["name"] = tc_chunk.function.name
-                                    if tc_chunk.function.arguments:
-                                        current_tool_call["function"]["arguments"] += tc_chunk.function.arguments
-            else:
-                # Non-streaming mode
-                if response.choices:
-                    choice = response.choices[0]
-                    message = choice.message
-                    
-                    # Handle content
-                    if message.content:
-                        print(message.content, end="", flush=True)
-                        assistant_message["content"] = message.content
-                    
-                    # Handle tool calls
-                    if message.tool_calls:
-                        assistant_message["tool_calls"] = []
-                        for tc in message.tool_calls:
-                            assistant_message["tool_calls"].append({
-                                "id": tc.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments
-                                }
-                            })
+            assistant_message = await self._dispatch.parse_response(response)
             
             print()  # New line after response
             
             # Validate tool calls - check if we have complete, valid tool calls
-            valid_tool_calls = []
-            if assistant_message["tool_calls"]:
-                for tc in assistant_message["tool_calls"]:
-                    # A valid tool call must have id, name, and valid JSON arguments
-                    if tc["id"] and tc["function"]["name"] and tc["function"]["arguments"]:
-                        try:
-                            # Verify arguments are valid JSON
-                            json.loads(tc["function"]["arguments"])
-                            valid_tool_calls.append(tc)
-                        except json.JSONDecodeError:
-                            # Skip invalid JSON silently
-                            pass
+            valid_tool_calls, tool_args_list = self._validate_tool_calls(assistant_message["tool_calls"])
             
             # Check if we have valid tool calls to execute
             if valid_tool_calls:
-                # Update the message with only valid tool calls
-                assistant_message["tool_calls"] = valid_tool_calls
-                
-                # For providers that don't support proper tool protocol, use a workaround
-                if not self.provider_config.supports_streaming_tools:
-                    # Don't add assistant message with tool_calls, use regular text instead
-                    messages.append({
-                        "role": "assistant",
-                        "content": "Let me search for that information..."
-                    })
-                else:
-                    # Add assistant message to history (with tool calls, content should be empty)
-                    # Different providers handle this differently:
-                    # - OpenAI: accepts None or no field
-                    # - Hyperbolic: seems to require empty string or the field present
-                    if assistant_message["tool_calls"]:
-                        if not assistant_message["content"]:
-                            assistant_message["content"] = ""  # Use empty string instead of None
-                    
-                    messages.append(assistant_message)
-                
+                await self._execute_tool_calls(messages, assistant_message, valid_tool_calls, tool_args_list)
                 has_used_tools = True
                 
-                # Execute tool calls
-                print("\n🔧 Executing tool calls...", file=sys.stderr)
-                
-                for tool_call in valid_tool_calls:
-                    tool_name = tool_call["function"]["name"]
-                    tool_args = json.loads(tool_call["function"]["arguments"])
-                    
-                    print(f"   • {tool_name}({json.dumps(tool_args, indent=2)})", file=sys.stderr)
-                    
-                    # Call MCP tool
-                    try:
-                        result = await self.mcp_client.call_tool(tool_name, tool_args)
-                        
-                        # Add tool result to messages
-                        # Some providers (like Hyperbolic) don't properly support role="tool"
-                        # so we use role="user" as a workaround for those providers
-                        if self.provider_config.supports_streaming_tools:
-                            # Provider properly supports tool protocol
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call["id"],
-                                "content": result
-                            })
-                        else:
-                            # Workaround: convert tool result to user message
-                            messages.append({
-                                "role": "user",
-                                "content": f"Tool '{tool_name}' result:\n{result}"
-                            })
-                        
-                        print(f"   ✅ {tool_name} completed", file=sys.stderr)
-                    
-                    except Exception as e:
-                        print(f"   ❌ {tool_name} failed: {e}", file=sys.stderr)
-                        error_content = json.dumps({"error": str(e)})
-                        
-                        if self.provider_config.supports_streaming_tools:
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call["id"],
-                                "content": error_content
-                            })
-                        else:
-                            messages.append({
-                                "role": "user",
-                                "content": f"Tool '{tool_name}' error:\n{error_content}"
-                            })
-                
                 print(file=sys.stderr)
                 # Continue loop to get final response
                 continue
             
             elif assistant_message["content"]:
                 # We have content but no tool calls - we're done
+                if cache_key is not None:
+                    self._response_cache[cache_key] = assistant_message["content"]
                 break
             
             else:
@@ -602,6 +935,81 @@ class ChatMCPApp:
         
         if iteration >= max_iterations:
             print("\n⚠️  Maximum iterations reached.", file=sys.stderr)
+    
+    async def process_batch(self, queries: List[str], batch_size: int = 10) -> List[str]:
+        """
+        Answer independent queries by packing them into shared prompts.
+        
+        The system prompt and tool schemas are paid once per batch instead of once
+        per query; answers are mapped back to queries by their item number.
+        
+        Args:
+            queries: Independent user questions
+            batch_size: Number of queries per LLM prompt
+        
+        Returns:
+            One answer per query, in the same order (empty string if missing)
+        """
+        tools = self.mcp_client.get_tools_for_llm()
+        # JSON mode is only guaranteed on the OpenAI API
+        response_format = {"type": "json_object"} if self.provider_id == "openai" else None
+        answers: List[str] = []
+        
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            items = "\n".join(f"[{i}] {query}" for i, query in enumerate(batch, 1))
+            messages = [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": _BATCH_INSTRUCTIONS + items}
+            ]
+            print(f"\n📦 Batch {start // batch_size + 1}: {len(batch)} queries", file=sys.stderr)
+            
+            content = ""
+            has_used_tools = False
+            for _ in range(10):
+                response = await self.llm_client.chat_completion(
+                    messages=messages,
+                    tools=tools,
+                    stream=False,
+                    response_format=response_format,
+                    tool_choice="none" if has_used_tools else "auto"
+                )
+                if not response.choices:
+                    break
+                message = response.choices[0].message
+                content = message.content or ""
+                tool_calls = [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {"name": tc.function.name, "arguments": tc.function.arguments}
+                    }
+                    for tc in message.tool_calls or []
+                ]
+                valid_tool_calls, tool_args_list = self._validate_tool_calls(tool_calls)
+                if not valid_tool_calls:
+                    break
+                assistant_message = {"role": "assistant", "content": content, "tool_calls": []}
+                await self._execute_tool_calls(messages, assistant_message, valid_tool_calls, tool_args_list)
+                has_used_tools = True
+            
+            answers.extend(self._parse_batch_answers(content, len(batch)))
+        
+        return answers
+    
+    def _parse_batch_answers(self, content: str, count: int) -> List[str]:
+        """Map a batched JSON response back to its items by id"""
+        by_id: Dict[int, str] = {}
+        try:
+            # Tolerate prose or code fences around the JSON object
+            payload = _loads(content[content.index("{"):content.rindex("}") + 1])
+            for entry in payload.get("answers", []):
+                by_id[int(entry["id"])] = str(entry.get("answer", ""))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            print("⚠️  Could not parse batched answers as JSON", file=sys.stderr)
+            if count == 1:
+                return [content]
+        return [by_id.get(i, "") for i in range(1, count + 1)]
 
 
 # ============================================================================
@@ -627,11 +1035,32 @@ async def main():
         default="easa_complete.db",
         help="Path to EASA database"
     )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="File with one question per line, answered non-interactively in batches"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10,
+        help="Number of questions packed into one LLM prompt in --batch mode (default: 10)"
+    )
     
     args = parser.parse_args()
     
+    # Load batch questions
+    batch_queries = None
+    if args.batch:
+        batch_file = Path(args.batch)
+        if not batch_file.exists():
+            print(f"❌ File not found: {args.batch}")
+            sys.exit(1)
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            batch_queries = [line.strip() for line in f if line.strip()]
+    
     # Load configuration
-    config_manager = ConfigManager()
+    config_manager = get_config_manager()
     
     # Select provider
     provider_id = args.provider
@@ -650,7 +1079,7 @@ async def main():
     # Create and start chat app
     try:
         app = ChatMCPApp(provider_id, config_manager)
-        await app.start()
+        await app.start(batch_queries=batch_queries, batch_size=args.batch_size)
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         import traceback
@@ -12,54 +12,102 @@ Usage:
 """
 
 import asyncio
+import atexit
+import hashlib
+import importlib
 import json
 import os
 import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional, Dict, List
+from typing import TYPE_CHECKING, Any, ClassVar, KeysView, Optional, Dict, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import argparse
 
-# Load environment variables
+@lru_cache(maxsize=1)
+def _load_env() -> Dict[str, str]:
+    """Load .env once (on first configuration read) and snapshot the environment"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        print("Warning: python-dotenv not installed. Using system environment variables.")
+    return os.environ.copy()
+
+
+def _get_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a configuration variable from the environment snapshot"""
+    return _load_env().get(name, default)
+
+
+# Stream for status and diagnostic messages (bound once at import)
+_err = sys.stderr
+
+# Fast JSON (optional): orjson is 2-5x faster than stdlib json
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
 except ImportError:
-    print("Warning: python-dotenv not installed. Using system environment variables.")
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
 
-# MCP imports
+# Faster event loop (optional, not available on Windows)
 try:
+    if sys.platform == "win32":
+        raise ImportError
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Heavy dependencies (CrewAI pulls in litellm and pydantic, mcp its SDK) are
+# imported on first use so that --help and provider listing stay fast
+if TYPE_CHECKING:
+    from crewai import Agent, Crew, Task
     from mcp import ClientSession, StdioServerParameters
-    from mcp.client.stdio import stdio_client
     from mcp.types import Tool
-except ImportError:
-    print("ERROR: mcp package not found. Install with: pip install mcp")
-    sys.exit(1)
 
-# CrewAI imports
-try:
-    from crewai import Agent, Task, Crew, Process
-    from crewai.tools import tool
-except ImportError as e:
-    print(f"ERROR: crewai package not found. Install with: pip install crewai crewai-tools")
-    print(f"   Import error details: {e}")
-    sys.exit(1)
-
-# Import custom LLM classes
-try:
-    from easacompliance.llm import HyperbolicLLM, OllamaLLM
-except ImportError:
-    print("Warning: easacompliance.llm not found. Custom providers may not work correctly.")
-    HyperbolicLLM = None
-    OllamaLLM = None
+
+def _import_or_exit(module: str, install_hint: str):
+    """Import a heavy dependency on first use, exiting with an install hint if missing"""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        print(f"ERROR: {module.split('.')[0]} package not found. Install with: {install_hint}")
+        print(f"   Import error details: {e}")
+        sys.exit(1)
+
+
+def _crewai():
+    """The crewai module (Agent, Task, Crew, Process)"""
+    return _import_or_exit("crewai", "pip install crewai crewai-tools")
+
+
+def _mcp():
+    """The mcp module (ClientSession, StdioServerParameters)"""
+    return _import_or_exit("mcp", "pip install mcp")
+
+
+@lru_cache(maxsize=1)
+def _custom_llm_classes() -> tuple:
+    """Import custom LLM classes (HyperbolicLLM, OllamaLLM)"""
+    try:
+        from easacompliance.llm import HyperbolicLLM, OllamaLLM
+    except ImportError:
+        print("Warning: easacompliance.llm not found. Custom providers may not work correctly.")
+        return None, None
+    return HyperbolicLLM, OllamaLLM
 
 
 # ============================================================================
 # Configuration Management (reused from chat_mcp.py)
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProviderConfig:
     """Configuration for an LLM provider"""
     name: str
@@ -73,66 +121,97 @@ class ProviderConfig:
 class ConfigManager:
     """Manages configuration for multiple LLM providers"""
     
+    __slots__ = ("providers", "_resolved", "easa_max_results", "easa_cache", "mcp_env")
+    
+    # Known provider IDs, in display order
+    PROVIDER_IDS = ("openai", "ollama", "hyperbolic")
+    
     def __init__(self):
+        # Providers are built lazily on first lookup (see get_provider)
         self.providers: Dict[str, ProviderConfig] = {}
-        self._load_providers()
-    
-    def _load_providers(self):
-        """Load provider configurations from environment variables"""
-        
-        # OpenAI
-        openai_key = os.getenv("OPENAI_API_KEY")
-        openai_base = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        openai_model = os.getenv("OPENAI_MODEL", "gpt-4o")
-        
-        if openai_key:
-            self.providers["openai"] = ProviderConfig(
-                name="OpenAI",
-                api_key=openai_key,
-                base_url=openai_base,
-                model=openai_model
-            )
+        self._resolved: set = set()
+        
+        # MCP server settings, validated once (fail fast on bad values)
+        max_results = _get_env("EASA_MAX_RESULTS", "20")
+        try:
+            self.easa_max_results = int(max_results)
+        except ValueError:
+            raise ValueError(f"EASA_MAX_RESULTS must be an integer, got {max_results!r}") from None
+        self.easa_cache = _get_env("EASA_CACHE", "true").lower() == "true"
         
-        # Ollama (local, no API key needed)
-        ollama_base = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
-        ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+        # Environment passed to the MCP server process (EASA_DB_PATH is added per client)
+        self.mcp_env: Dict[str, str] = {
+            "EASA_MODEL": _get_env("EASA_MODEL", "all-MiniLM-L6-v2"),
+            "EASA_ENCODE_BACKEND": _get_env("EASA_ENCODE_BACKEND", "torch"),
+            "EASA_MAX_RESULTS": str(self.easa_max_results),
+            "EASA_CACHE": "true" if self.easa_cache else "false",
+        }
+    
+    def _build_openai(self) -> Optional[ProviderConfig]:
+        """OpenAI provider (requires OPENAI_API_KEY)"""
+        openai_key = _get_env("OPENAI_API_KEY")
+        if not openai_key:
+            return None
         
-        self.providers["ollama"] = ProviderConfig(
+        return ProviderConfig(
+            name="OpenAI",
+            api_key=openai_key,
+            base_url=_get_env("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            model=_get_env("OPENAI_MODEL", "gpt-4o")
+        )
+    
+    def _build_ollama(self) -> Optional[ProviderConfig]:
+        """Ollama provider (local, no API key needed)"""
+        return ProviderConfig(
             name="Ollama (Local)",
             api_key="ollama",
-            base_url=ollama_base,
-            model=ollama_model
+            base_url=_get_env("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
+            model=_get_env("OLLAMA_MODEL", "llama3.1:8b")
         )
+    
+    def _build_hyperbolic(self) -> Optional[ProviderConfig]:
+        """Hyperbolic provider (requires HYPERBOLIC_API_KEY)"""
+        hyperbolic_key = _get_env("HYPERBOLIC_API_KEY")
+        if not hyperbolic_key:
+            return None
         
-        # Hyperbolic
-        hyperbolic_key = os.getenv("HYPERBOLIC_API_KEY")
-        hyperbolic_base = os.getenv("HYPERBOLIC_BASE_URL", "https://api.hyperbolic.xyz/v1")
-        hyperbolic_model = os.getenv("HYPERBOLIC_MODEL", "meta-llama/Meta-Llama-3.1-70B-Instruct")
-        
-        if hyperbolic_key:
-            self.providers["hyperbolic"] = ProviderConfig(
-                name="Hyperbolic",
-                api_key=hyperbolic_key,
-                base_url=hyperbolic_base,
-                model=hyperbolic_model
-            )
+        return ProviderConfig(
+            name="Hyperbolic",
+            api_key=hyperbolic_key,
+            base_url=_get_env("HYPERBOLIC_BASE_URL", "https://api.hyperbolic.xyz/v1"),
+            model=_get_env("HYPERBOLIC_MODEL", "meta-llama/Meta-Llama-3.1-70B-Instruct")
+        )
     
     def get_provider(self, provider_id: str) -> Optional[ProviderConfig]:
-        """Get provider configuration by ID"""
+        """Get provider configuration by ID (built and memoized on first access)"""
+        if provider_id not in self._resolved:
+            self._resolved.add(provider_id)
+            config = None
+            if provider_id in self.PROVIDER_IDS:
+                config = getattr(self, f"_build_{provider_id}")()
+            if config:
+                self.providers[provider_id] = config
         return self.providers.get(provider_id)
     
-    def list_providers(self) -> List[str]:
-        """List available provider IDs"""
-        return list(self.providers.keys())
+    def list_providers(self) -> KeysView[str]:
+        """List available provider IDs (live view of the configured providers)"""
+        for provider_id in self.PROVIDER_IDS:
+            self.get_provider(provider_id)
+        return self.providers.keys()
     
     def select_provider_interactive(self) -> Optional[str]:
         """Interactive provider selection"""
-        providers = self.list_providers()
+        providers = tuple(self.list_providers())
         
         if not providers:
             print("❌ No providers configured. Please check your .env file.")
             return None
         
+        # Nothing to choose from: skip the menu
+        if len(providers) == 1:
+            print(f"✅ Auto-selected: {self.providers[providers[0]].name}")
+            return providers[0]
+        
         print("\n" + "=" * 80)
         print("🤖 Available LLM Providers")
         print("=" * 80)
@@ -161,6 +240,12 @@ class ConfigManager:
                 return None
 
 
+@lru_cache(maxsize=1)
+def get_config_manager() -> ConfigManager:
+    """Return the process-wide ConfigManager"""
+    return ConfigManager()
+
+
 # ============================================================================
 # MCP Client (reused from chat_mcp.py)
 # ============================================================================
@@ -168,17 +253,28 @@ class ConfigManager:
 class MCPClient:
     """Client for interacting with MCP server"""
     
-    def __init__(self, db_path: str = "easa_complete.db"):
+    __slots__ = ("db_path", "config_manager", "session", "tools", "tools_dict", "_read", "_write", "_server_process")
+    
+    # Validated server parameters, keyed on (db_path, pid) so forks re-validate
+    _server_params_cache: ClassVar[Dict[Tuple[str, int], "StdioServerParameters"]] = {}
+    
+    def __init__(self, db_path: str = "easa_complete.db", config_manager: Optional[ConfigManager] = None):
         self.db_path = db_path
-        self.session: Optional[ClientSession] = None
-        self.tools: List[Tool] = []
-        self.tools_dict: Dict[str, Tool] = {}
+        self.config_manager = config_manager or get_config_manager()
+        self.session: Optional["ClientSession"] = None
+        self.tools: List["Tool"] = []
+        self.tools_dict: Dict[str, "Tool"] = {}
         self._read = None
         self._write = None
         self._server_process = None
     
     async def connect(self):
         """Connect to the MCP server"""
+        cache_key = (self.db_path, os.getpid())
+        cached = MCPClient._server_params_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         root = Path(__file__).parent
         server_script = root / "run_mcp_server.py"
         
@@ -189,29 +285,25 @@ class MCPClient:
         if not db_full_path.exists():
             raise FileNotFoundError(f"Database not found: {db_full_path}")
         
-        server_params = StdioServerParameters(
+        server_params = _mcp().StdioServerParameters(
             command=sys.executable,
             args=[str(server_script)],
-            env={
-                "EASA_DB_PATH": str(db_full_path),
-                "EASA_MODEL": os.getenv("EASA_MODEL", "all-MiniLM-L6-v2"),
-                "EASA_MAX_RESULTS": os.getenv("EASA_MAX_RESULTS", "20"),
-                "EASA_CACHE": os.getenv("EASA_CACHE", "true")
-            }
+            env={"EASA_DB_PATH": str(db_full_path), **self.config_manager.mcp_env}
         )
         
+        MCPClient._server_params_cache[cache_key] = server_params
         return server_params
     
-    async def initialize(self, session: ClientSession):
+    async def initialize(self, session: "ClientSession"):
         """Initialize the MCP session and load tools"""
         self.session = session
         await self.session.initialize()
         
         tools_response = await self.session.list_tools()
-        self.tools = tools_response.tools
-        self.tools_dict = {tool.name: tool for tool in self.tools}
+        self.tools = tools = tools_response.tools
+        self.tools_dict = {tool.name: tool for tool in tools}
         
-        print(f"✅ Connected to MCP server: {len(self.tools)} tools available", file=sys.stderr)
+        _err.write(f"✅ Connected to MCP server: {len(tools)} tools available\n")
     
     async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
         """Call an MCP tool and return the result"""
@@ -229,34 +321,148 @@ class MCPClient:
 # MCP Tools Wrappers for CrewAI
 # ============================================================================
 
-# Global MCP client instance (will be set during initialization)
-_mcp_client: Optional[MCPClient] = None
-_event_loop: Optional[asyncio.AbstractEventLoop] = None
+# LRU cache of tool results, cleared at the start of each audit.
+# All exposed MCP tools are read-only queries, so identical calls
+# (e.g. the QA challenger re-checking the auditor's references) can share results.
+TOOL_CACHE_SIZE = 512
+TOOL_CACHE_HASH_THRESHOLD = 256  # Long string arguments are keyed by digest
+_tool_cache: "OrderedDict[tuple, str]" = OrderedDict()
+# Calls in flight, by cache key: concurrent identical calls wait on the same reply
+_tool_inflight: Dict[tuple, "_Reply"] = {}
+_tool_cache_lock = threading.Lock()
+
+
+def _tool_cache_key(tool_name: str, kwargs: Dict[str, Any]) -> tuple:
+    """Build a hashable cache key, digesting long text arguments"""
+    items = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, str) and len(value) > TOOL_CACHE_HASH_THRESHOLD:
+            value = hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+        items.append((name, value))
+    return (tool_name, tuple(items))
 
 
-def _sync_call_mcp_tool(tool_name: str, **kwargs) -> str:
-    """Synchronous wrapper to call MCP tools from CrewAI"""
-    global _mcp_client, _event_loop
+def clear_tool_cache():
+    """Drop all cached MCP tool results"""
+    with _tool_cache_lock:
+        _tool_cache.clear()
+
+
+TOOL_CALL_TIMEOUT = 120  # seconds (complex queries can be slow)
+
+
+class _Reply:
+    """Reply slot for one queued tool call, signalled through a threading.Event"""
     
-    if not _mcp_client or not _event_loop:
-        return json.dumps({"error": "MCP client not initialized"})
+    __slots__ = ("done", "result", "error", "abandoned", "waiters")
     
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+        self.waiters = 1  # Callers waiting on this reply (guarded by _tool_cache_lock)
+
+
+async def _run_queued_call(client: MCPClient, tool_name: str, kwargs: Dict[str, Any], reply: _Reply):
+    """Run one queued tool call and signal its reply"""
+    # Skip calls whose caller already gave up (timeout)
+    if reply.abandoned:
+        return
     try:
-        # Run async call in the event loop running in main thread
-        future = asyncio.run_coroutine_threadsafe(
-            _mcp_client.call_tool(tool_name, kwargs),
-            _event_loop
-        )
-        result = future.result(timeout=120)  # Increased timeout for complex queries
-        return result
+        reply.result = await client.call_tool(tool_name, kwargs)
     except Exception as e:
-        error_msg = f"{type(e).__name__}: {str(e)}"
-        print(f"⚠️  MCP tool '{tool_name}' failed: {error_msg}", file=sys.stderr)
-        return json.dumps({"error": error_msg})
+        reply.error = e
+    except asyncio.CancelledError:
+        # Dispatcher stopped (cleanup_mcp) while the call was running
+        reply.error = RuntimeError("MCP client closed during the call")
+        raise
+    finally:
+        reply.done.set()
+
+
+async def _mcp_dispatcher(client: MCPClient, queue: asyncio.Queue):
+    """Long-running worker: start each queued tool call as its own task"""
+    # Strong references: the event loop only keeps weak references to tasks
+    running: set = set()
+    try:
+        while True:
+            item = await queue.get()
+            task = asyncio.create_task(_run_queued_call(client, *item))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        for task in running:
+            task.cancel()
+
+
+def _mcp_not_initialized(tool_name: str, **kwargs) -> str:
+    """Tool call used before initialize_mcp() / after cleanup_mcp()"""
+    return _dumps({"error": "MCP client not initialized"})
+
+
+def _make_call(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+    """Build the synchronous tool-call function bound to an event loop and dispatcher queue"""
+    # Everything the hot path touches is bound as closure locals
+    post = loop.call_soon_threadsafe
+    put = queue.put_nowait
+    cache, cache_lock, cache_key, inflight = _tool_cache, _tool_cache_lock, _tool_cache_key, _tool_inflight
+    
+    def _call(tool_name: str, **kwargs) -> str:
+        """Synchronous wrapper to call MCP tools from CrewAI"""
+        key = cache_key(tool_name, kwargs)
+        with cache_lock:
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                return cached
+            # Same call already in flight: wait for its reply instead of sending another
+            reply = inflight.get(key)
+            owner = reply is None
+            if owner:
+                reply = inflight[key] = _Reply()
+            else:
+                reply.waiters += 1
+        
+        try:
+            if owner:
+                # Hand the call to the dispatcher running in the main thread's event loop
+                post(put, (tool_name, kwargs, reply))
+            if not reply.done.wait(TOOL_CALL_TIMEOUT):
+                with cache_lock:
+                    reply.waiters -= 1
+                    # Skipped by the dispatcher only once every waiter has given up
+                    reply.abandoned = reply.waiters == 0
+                raise TimeoutError(f"no reply from MCP server after {TOOL_CALL_TIMEOUT}s")
+            if reply.error is not None:
+                raise reply.error
+            result = reply.result
+            
+            # Only successful results are cached (once, by the caller that sent the call)
+            if owner:
+                with cache_lock:
+                    cache[key] = result
+                    if len(cache) > TOOL_CACHE_SIZE:
+                        cache.popitem(last=False)
+            return result
+        except Exception as e:
+            error_msg = f"{type(e).__name__}: {str(e)}"
+            _err.write(f"⚠️  MCP tool '{tool_name}' failed: {error_msg}\n")
+            return _dumps({"error": error_msg})
+        finally:
+            if owner:
+                with cache_lock:
+                    if inflight.get(key) is reply:
+                        del inflight[key]
+    
+    return _call
+
 
+# Rebound by ComplianceCrewApp.initialize_mcp() / cleanup_mcp()
+_sync_call_mcp_tool = _mcp_not_initialized
 
-@tool("search_easa_regulations")
-def search_easa_regulations(query: str, top_k: int = 5, min_score: float = 0.0) -> str:
+
+def _search_easa_regulations(query: str, top_k: int = 5, min_score: float = 0.0) -> str:
     """
     Search EASA regulations using semantic similarity.
     
@@ -271,8 +477,7 @@ def search_easa_regulations(query: str, top_k: int = 5, min_score: float = 0.0)
     return _sync_call_mcp_tool("search_regulations", query=query, top_k=top_k, min_score=min_score)
 
 
-@tool("get_easa_regulation")
-def get_easa_regulation(reference: str) -> str:
+def _get_easa_regulation(reference: str) -> str:
     """
     Retrieve a specific EASA regulation by its exact reference.
     
@@ -285,8 +490,7 @@ def get_easa_regulation(reference: str) -> str:
     return _sync_call_mcp_tool("get_regulation", reference=reference)
 
 
-@tool("get_regulatory_chain")
-def get_regulatory_chain(reference: str) -> str:
+def _get_regulatory_chain(reference: str) -> str:
     """
     Get a complete regulatory chain for an IR (Implementing Rule).
     Returns the IR and all associated AMC and GM.
@@ -300,8 +504,7 @@ def get_regulatory_chain(reference: str) -> str:
     return _sync_call_mcp_tool("get_regulatory_chain", reference=reference)
 
 
-@tool("list_easa_categories")
-def list_easa_categories(limit: int = 20) -> str:
+def _list_easa_categories(limit: int = 20) -> str:
     """
     List all available EASA regulation categories.
     Returns categories sorted by number of regulations.
@@ -315,8 +518,7 @@ def list_easa_categories(limit: int = 20) -> str:
     return _sync_call_mcp_tool("list_categories", limit=limit)
 
 
-@tool("validate_text_compliance")
-def validate_text_compliance(text: str, top_k: int = 10, min_score: float = 0.3) -> str:
+def _validate_text_compliance(text: str, top_k: int = 10, min_score: float = 0.3) -> str:
     """
     Validate compliance of a text against EASA regulations.
     Returns compliance score, relevant regulations, identified gaps, and recommendations.
@@ -332,8 +534,7 @@ def validate_text_compliance(text: str, top_k: int = 10, min_score: float = 0.3)
     return _sync_call_mcp_tool("validate_compliance", text=text, top_k=top_k, min_score=min_score)
 
 
-@tool("get_statistics")
-def get_easa_statistics() -> str:
+def _get_easa_statistics() -> str:
     """
     Get comprehensive statistics about the EASA regulatory database.
     Returns total number of regulations, breakdown by type and category.
@@ -344,53 +545,69 @@ def get_easa_statistics() -> str:
     return _sync_call_mcp_tool("get_statistics")
 
 
+# Module attribute name -> (CrewAI tool name, plain implementation)
+_TOOL_FUNCTIONS = {
+    "search_easa_regulations": ("search_easa_regulations", _search_easa_regulations),
+    "get_easa_regulation": ("get_easa_regulation", _get_easa_regulation),
+    "get_regulatory_chain": ("get_regulatory_chain", _get_regulatory_chain),
+    "list_easa_categories": ("list_easa_categories", _list_easa_categories),
+    "validate_text_compliance": ("validate_text_compliance", _validate_text_compliance),
+    "get_easa_statistics": ("get_statistics", _get_easa_statistics),
+}
+
+
+@lru_cache(maxsize=1)
+def _crew_tools() -> Dict[str, Any]:
+    """Wrap the MCP tool functions with CrewAI's @tool (on first use)"""
+    tool = _import_or_exit("crewai.tools", "pip install crewai crewai-tools").tool
+    return {attr: tool(tool_name)(func) for attr, (tool_name, func) in _TOOL_FUNCTIONS.items()}
+
+
+def __getattr__(name: str):
+    # Lazy module attributes: the CrewAI-wrapped tools (e.g. compliance_crew.search_easa_regulations)
+    if name in _TOOL_FUNCTIONS:
+        return _crew_tools()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # ============================================================================
 # CrewAI Agents Configuration
 # ============================================================================
 
-def create_compliance_auditor(llm_config: Dict[str, Any]) -> Agent:
-    """Create the Compliance Auditor agent"""
-    return Agent(
-        role="EASA Compliance Auditor",
-        goal="Thoroughly analyze the provided text and identify all potential compliance issues with EASA regulations",
-        backstory="""You are a senior aviation compliance auditor with over 15 years of experience 
+_AUDITOR_BACKSTORY = """You are a senior aviation compliance auditor with over 15 years of experience 
         in EASA regulations. You have audited hundreds of aviation operations and are known for your 
         meticulous attention to detail. You systematically analyze every aspect of operational texts 
         against the full scope of EASA regulations, leaving no stone unturned. You always cite specific 
-        regulation references and provide clear explanations of any non-compliance.""",
-        tools=[
-            search_easa_regulations,
-            get_easa_regulation,
-            get_regulatory_chain,
-            list_easa_categories,
-            validate_text_compliance,
-            get_easa_statistics
-        ],
+        regulation references and provide clear explanations of any non-compliance."""
+
+_QA_CHALLENGER_BACKSTORY = """You are a critical quality assurance expert specializing in aviation compliance 
+        audits. Your role is to be the devil's advocate - you question every finding, verify every 
+        regulation reference, and identify any gaps in the audit. You have caught numerous errors in 
+        past audits where regulations were misinterpreted or compliance issues were missed. You are 
+        respected for your rigor and your ability to improve audit quality through constructive challenge. 
+        You always back your challenges with specific regulatory evidence."""
+
+
+def create_compliance_auditor(llm_config: Dict[str, Any]) -> "Agent":
+    """Create the Compliance Auditor agent"""
+    return _crewai().Agent(
+        role="EASA Compliance Auditor",
+        goal="Thoroughly analyze the provided text and identify all potential compliance issues with EASA regulations",
+        backstory=_AUDITOR_BACKSTORY,
+        tools=list(_crew_tools().values()),
         verbose=True,
         allow_delegation=False,
         llm=llm_config["model"]
     )
 
 
-def create_qa_challenger(llm_config: Dict[str, Any]) -> Agent:
+def create_qa_challenger(llm_config: Dict[str, Any]) -> "Agent":
     """Create the Quality Assurance Challenger agent"""
-    return Agent(
+    return _crewai().Agent(
         role="Quality Assurance Challenger",
         goal="Review and challenge the auditor's findings to ensure accuracy, completeness, and proper regulatory interpretation",
-        backstory="""You are a critical quality assurance expert specializing in aviation compliance 
-        audits. Your role is to be the devil's advocate - you question every finding, verify every 
-        regulation reference, and identify any gaps in the audit. You have caught numerous errors in 
-        past audits where regulations were misinterpreted or compliance issues were missed. You are 
-        respected for your rigor and your ability to improve audit quality through constructive challenge. 
-        You always back your challenges with specific regulatory evidence.""",
-        tools=[
-            search_easa_regulations,
-            get_easa_regulation,
-            get_regulatory_chain,
-            list_easa_categories,
-            validate_text_compliance,
-            get_easa_statistics
-        ],
+        backstory=_QA_CHALLENGER_BACKSTORY,
+        tools=list(_crew_tools().values()),
         verbose=True,
         allow_delegation=False,
         llm=llm_config["model"]
@@ -401,13 +618,11 @@ def create_qa_challenger(llm_config: Dict[str, Any]) -> Agent:
 # CrewAI Tasks Configuration
 # ============================================================================
 
-def create_audit_task(text_to_audit: str, auditor: Agent) -> Task:
-    """Create the initial audit task"""
-    return Task(
-        description=f"""Conduct a comprehensive compliance audit of the following text against EASA regulations:
+# Task descriptions (built once; the audit description is filled with str.format)
+_AUDIT_DESCRIPTION_TEMPLATE = """Conduct a comprehensive compliance audit of the following text against EASA regulations:
 
 TEXT TO AUDIT:
-{text_to_audit}
+{text}
 
 AUDIT REQUIREMENTS:
 1. Identify ALL applicable EASA regulations for this text
@@ -431,9 +646,9 @@ OUTPUT FORMAT (provide structured data for each finding):
 - Issue description
 - Exact regulatory requirement
 - Recommended correction
-""",
-        agent=auditor,
-        expected_output="""A detailed list of compliance findings with:
+"""
+
+_AUDIT_EXPECTED_OUTPUT = """A detailed list of compliance findings with:
 - Unique ID for each finding
 - Criticality level (HIGH/MEDIUM/LOW)
 - Exact text excerpt that has the issue
@@ -441,13 +656,8 @@ OUTPUT FORMAT (provide structured data for each finding):
 - Clear description of the non-compliance
 - The exact regulatory requirement
 - Recommended corrective action"""
-    )
 
-
-def create_challenge_task(auditor: Agent, qa_challenger: Agent) -> Task:
-    """Create the QA challenge task"""
-    return Task(
-        description="""Review the auditor's findings with a critical eye. Your responsibilities:
+_CHALLENGE_DESCRIPTION = """Review the auditor's findings with a critical eye. Your responsibilities:
 
 VERIFICATION TASKS:
 1. Verify each regulation reference is correct and applicable
@@ -475,22 +685,16 @@ For each finding from the auditor:
 - QA Status: CONFIRMED / CHALLENGED / REJECTED / MODIFIED
 - Justification with regulatory evidence
 - Additional findings missed by the auditor (if any)
-""",
-        agent=qa_challenger,
-        expected_output="""A comprehensive QA review containing:
+"""
+
+_CHALLENGE_EXPECTED_OUTPUT = """A comprehensive QA review containing:
 - Validation status for each auditor finding
 - Specific evidence supporting confirmation or challenge
 - Any additional findings not identified by the auditor
 - Corrections to criticality levels if needed
 - Final list of validated findings"""
-        # Note: context will be set in create_crew() after task objects are created
-    )
 
-
-def create_final_report_task(auditor: Agent, qa_challenger: Agent, text_to_audit: str) -> Task:
-    """Create the final report consolidation task"""
-    return Task(
-        description="""Consolidate the audit findings and QA review into a final compliance report.
+_FINAL_REPORT_DESCRIPTION = """Consolidate the audit findings and QA review into a final compliance report.
 
 CONSOLIDATION REQUIREMENTS:
 1. Include only VALIDATED findings (confirmed by QA)
@@ -541,14 +745,41 @@ Prioritized list of actions needed
 Overall assessment and next steps
 
 IMPORTANT: Use proper Markdown formatting with headers, bold, lists, etc.
-""",
-        agent=auditor,  # Auditor writes final report after incorporating QA feedback
-        expected_output="""A complete, well-formatted Markdown compliance audit report with:
+"""
+
+_FINAL_REPORT_EXPECTED_OUTPUT = """A complete, well-formatted Markdown compliance audit report with:
 - Executive summary with statistics
 - All validated findings organized by criticality
 - Complete regulatory references and quotes
 - Actionable recommendations
 - Professional formatting suitable for stakeholders"""
+
+
+def create_audit_task(text_to_audit: str, auditor: "Agent") -> "Task":
+    """Create the initial audit task"""
+    return _crewai().Task(
+        description=_AUDIT_DESCRIPTION_TEMPLATE.format(text=text_to_audit),
+        agent=auditor,
+        expected_output=_AUDIT_EXPECTED_OUTPUT
+    )
+
+
+def create_challenge_task(auditor: "Agent", qa_challenger: "Agent") -> "Task":
+    """Create the QA challenge task"""
+    return _crewai().Task(
+        description=_CHALLENGE_DESCRIPTION,
+        agent=qa_challenger,
+        expected_output=_CHALLENGE_EXPECTED_OUTPUT
+        # Note: context will be set in create_crew() after task objects are created
+    )
+
+
+def create_final_report_task(auditor: "Agent", qa_challenger: "Agent", text_to_audit: str) -> "Task":
+    """Create the final report consolidation task"""
+    return _crewai().Task(
+        description=_FINAL_REPORT_DESCRIPTION,
+        agent=auditor,  # Auditor writes final report after incorporating QA feedback
+        expected_output=_FINAL_REPORT_EXPECTED_OUTPUT
         # Note: context will be set in create_crew() after task objects are created
     )
 
@@ -560,16 +791,23 @@ IMPORTANT: Use proper Markdown formatting with headers, bold, lists, etc.
 class ComplianceCrewApp:
     """Main application for EASA compliance auditing with CrewAI"""
     
-    def __init__(self, provider_id: str, config_manager: ConfigManager, verbose: bool = True):
+    __slots__ = (
+        "provider_id", "config_manager", "provider_config", "verbose",
+        "llm_instance", "llm_config", "mcp_client", "crew", "_agent_cache",
+        "_stdio_context", "_session_context", "_mcp_worker",
+    )
+    
+    def __init__(self, provider_id: str, config_manager: Optional[ConfigManager] = None, verbose: bool = True):
         self.provider_id = provider_id
-        self.config_manager = config_manager
-        self.provider_config = config_manager.get_provider(provider_id)
+        self.config_manager = config_manager or get_config_manager()
+        self.provider_config = self.config_manager.get_provider(provider_id)
         self.verbose = verbose
         
         if not self.provider_config:
             raise ValueError(f"Provider '{provider_id}' not configured")
         
         # Setup LLM - use custom LLM classes for providers that don't work with litellm
+        HyperbolicLLM, OllamaLLM = _custom_llm_classes()
         if provider_id == "hyperbolic" and HyperbolicLLM is not None:
             # Use custom HyperbolicLLM class to avoid litellm issues
             self.llm_instance = HyperbolicLLM(
@@ -600,46 +838,63 @@ class ComplianceCrewApp:
                 "model": self.provider_config.model,
             }
         
-        self.mcp_client = MCPClient()
+        self.mcp_client = MCPClient(config_manager=self.config_manager)
         self.crew = None
+        # Agents only depend on the provider, so they are reused across audits
+        self._agent_cache: Dict[str, "Agent"] = {}
     
     async def initialize_mcp(self):
         """Initialize MCP connection"""
-        global _mcp_client, _event_loop
+        global _sync_call_mcp_tool
         
-        print("🔌 Connecting to MCP server...", file=sys.stderr)
+        _err.write("🔌 Connecting to MCP server...\n")
         server_params = await self.mcp_client.connect()
         
         # Start MCP server and store connection
-        from mcp.client.stdio import stdio_client
+        stdio_client = _import_or_exit("mcp.client.stdio", "pip install mcp").stdio_client
         
         self._stdio_context = stdio_client(server_params)
         read, write = await self._stdio_context.__aenter__()
         
-        self._session_context = ClientSession(read, write)
+        self._session_context = _mcp().ClientSession(read, write)
         session = await self._session_context.__aenter__()
         
         await self.mcp_client.initialize(session)
         
-        # Set global references for tool wrappers
-        # IMPORTANT: Store the CURRENT event loop (where session was created)
-        _mcp_client = self.mcp_client
-        _event_loop = asyncio.get_running_loop()
+        # Bind the tool wrappers to the dispatcher
+        # IMPORTANT: Use the CURRENT event loop (where session was created)
+        queue = asyncio.Queue()
+        self._mcp_worker = asyncio.create_task(_mcp_dispatcher(self.mcp_client, queue))
+        _sync_call_mcp_tool = _make_call(asyncio.get_running_loop(), queue)
         
-        print("✅ MCP server connected with background event loop", file=sys.stderr)
+        _err.write("✅ MCP server connected with background event loop\n")
     
     async def cleanup_mcp(self):
         """Cleanup MCP connection"""
+        global _sync_call_mcp_tool
+        
+        if hasattr(self, '_mcp_worker'):
+            _sync_call_mcp_tool = _mcp_not_initialized
+            self._mcp_worker.cancel()
+            try:
+                await self._mcp_worker
+            except asyncio.CancelledError:
+                pass
+            del self._mcp_worker
         if hasattr(self, '_session_context'):
             await self._session_context.__aexit__(None, None, None)
         if hasattr(self, '_stdio_context'):
             await self._stdio_context.__aexit__(None, None, None)
     
-    def create_crew(self, text_to_audit: str) -> Crew:
+    def create_crew(self, text_to_audit: str) -> "Crew":
         """Create the compliance audit crew"""
-        # Create agents
-        auditor = create_compliance_auditor(self.llm_config)
-        qa_challenger = create_qa_challenger(self.llm_config)
+        # Create agents (cached per app instance; tasks embed the text and are rebuilt)
+        auditor = self._agent_cache.get("auditor")
+        if auditor is None:
+            auditor = self._agent_cache["auditor"] = create_compliance_auditor(self.llm_config)
+        qa_challenger = self._agent_cache.get("qa_challenger")
+        if qa_challenger is None:
+            qa_challenger = self._agent_cache["qa_challenger"] = create_qa_challenger(self.llm_config)
         
         # Create tasks
         audit_task = create_audit_task(text_to_audit, auditor)
@@ -651,10 +906,11 @@ class ComplianceCrewApp:
         final_report_task.context = [audit_task, challenge_task]
         
         # Create crew
-        crew = Crew(
+        crewai = _crewai()
+        crew = crewai.Crew(
             agents=[auditor, qa_challenger],
             tasks=[audit_task, challenge_task, final_report_task],
-            process=Process.sequential,
+            process=crewai.Process.sequential,
             verbose=self.verbose,
             memory=False  # Disable memory to avoid embedding authentication issues
         )
@@ -672,60 +928,39 @@ class ComplianceCrewApp:
         print(f"💾 Output: {output_file}")
         print("=" * 80 + "\n")
         
-        # Initialize MCP
+        # Initialize MCP (and start from an empty tool result cache)
+        clear_tool_cache()
         await self.initialize_mcp()
         
         try:
             # Create and run crew
-            print("🚀 Starting compliance audit crew...\n", file=sys.stderr)
+            _err.write("🚀 Starting compliance audit crew...\n\n")
             crew = self.create_crew(text_to_audit)
             
-            # Run the crew in a thread to keep event loop free for MCP calls
-            import concurrent.futures
-            import threading
-            
-            result_container = {}
-            exception_container = {}
-            
-            def run_crew_sync():
-                """Run crew.kickoff() in a separate thread"""
-                try:
-                    result_container['result'] = crew.kickoff()
-                except Exception as e:
-                    exception_container['exception'] = e
-            
-            print("🔄 Launching crew in background thread (keeping event loop free for MCP calls)...", file=sys.stderr)
-            crew_thread = threading.Thread(target=run_crew_sync, daemon=False)
-            crew_thread.start()
-            
-            # Keep event loop active while crew runs
-            while crew_thread.is_alive():
-                await asyncio.sleep(0.1)  # Allow event loop to process MCP calls
-            
-            # Check for exceptions
-            if 'exception' in exception_container:
-                raise exception_container['exception']
-            
-            result = result_container.get('result')
+            # Run the crew in a worker thread to keep the event loop free for MCP calls
+            _err.write("🔄 Launching crew in background thread (keeping event loop free for MCP calls)...\n")
+            result = await asyncio.to_thread(crew.kickoff)
             
             # Extract text from CrewOutput object
             # CrewAI returns a CrewOutput object, we need to get the string content
             report_text = str(result.raw) if hasattr(result, 'raw') else str(result)
             
             # Save report
-            print(f"\n💾 Saving report to {output_file}...", file=sys.stderr)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report_text)
+            _err.write(f"\n💾 Saving report to {output_file}...\n")
+            Path(output_file).write_text(report_text, encoding='utf-8')
             
-            print(f"✅ Report saved successfully!", file=sys.stderr)
+            _err.write("✅ Report saved successfully!\n")
             print("\n" + "=" * 80)
             print("📄 REPORT PREVIEW")
             print("=" * 80)
-            print(report_text[:1000] + "\n..." if len(report_text) > 1000 else report_text)
+            if len(report_text) > 1000:
+                print(f"{report_text[:1000]}\n...")
+            else:
+                print(report_text)
             print("=" * 80)
             
             return report_text
-            
+        
         finally:
             # Cleanup MCP connection
             await self.cleanup_mcp()
@@ -787,7 +1022,7 @@ async def main():
     args = parser.parse_args()
     
     # Load configuration
-    config_manager = ConfigManager()
+    config_manager = get_config_manager()
     
     # Select provider
     provider_id = args.provider
@@ -798,7 +1033,7 @@ async def main():
         print("❌ No provider selected")
         sys.exit(1)
     
-    if provider_id not in config_manager.list_providers():
+    if config_manager.get_provider(provider_id) is None:
         print(f"❌ Provider '{provider_id}' not configured. Check your .env file.")
         sys.exit(1)
     
@@ -856,33 +1091,36 @@ async def main():
         await app.run_audit(text_to_audit, args.output)
         
         print(f"\n✅ Audit complete! Report saved to: {args.output}")
-        
+    
     except KeyboardInterrupt:
         print("\n⚠️  Audit interrupted by user")
         sys.exit(130)
     except Exception as e:
-        print(f"❌ Error: {e}", file=sys.stderr)
+        _err.write(f"❌ Error: {e}\n")
         import traceback
         traceback.print_exc()
         sys.exit(1)
 
 
+def _silence_stderr_at_exit():
+    """Point fd 2 at /dev/null for interpreter teardown"""
+    # CrewAI's FilteredStream tries to flush after sys.stderr is closed (known bug);
+    # the resulting error is printed during interpreter teardown, after main() returned
+    try:
+        sys.stderr.flush()
+    except (OSError, ValueError):
+        pass
+    null_fd = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null_fd, 2)
+    os.close(null_fd)
+
+
 if __name__ == "__main__":
-    import io
+    # Registered first so it runs last, once the other exit handlers had their say
+    atexit.register(_silence_stderr_at_exit)
     
-    # Suppress CrewAI's FilteredStream cleanup error
-    # This is a known CrewAI bug where FilteredStream tries to flush after sys.stderr is closed
-    # We temporarily redirect stderr during cleanup to hide the error message
-    original_stderr = sys.stderr
+    # Use uvloop for the loop serving MCP calls when installed
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     
-    try:
-        asyncio.run(main())
-    finally:
-        # Temporarily suppress stderr to hide CrewAI cleanup error
-        sys.stderr = io.StringIO()
-        # Give time for any background cleanup
-        import time
-        time.sleep(0.1)
-        # Restore stderr
-        sys.stderr = original_stderr
-
+    asyncio.run(main())
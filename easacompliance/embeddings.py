@@ -11,10 +11,12 @@ Date: 2025
 
 import sqlite3
 import json
+import time
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from functools import cached_property
 from tqdm import tqdm
 
 # Import relatif ou absolu selon le contexte
@@ -24,6 +26,121 @@ except ImportError:
     # Fallback pour import direct
     from easacompliance.parser import Topic, TopicType, EASAParser
 
+# sqlite-vec (optionnel) : recherche k-NN native dans SQLite
+try:
+    import sqlite_vec
+except ImportError:
+    sqlite_vec = None
+
+# Format de stockage des embeddings (fp16 : moitié moins d'octets à lire que fp32,
+# sans effet mesurable sur le classement cosinus). Les lignes anciennes restent en float32.
+EMBEDDING_DTYPE = "float16"
+
+
+def _decode_embeddings(blobs: List[bytes], dtypes: List[str]) -> np.ndarray:
+    """Décode des BLOBs d'embeddings (float16/float32) en une matrice float32"""
+    if len(set(dtypes)) == 1:
+        flat = np.frombuffer(b"".join(blobs), dtype=dtypes[0])
+        return flat.reshape(len(blobs), -1).astype(np.float32)
+    return np.stack([
+        np.frombuffer(blob, dtype=dtype).astype(np.float32)
+        for blob, dtype in zip(blobs, dtypes)
+    ])
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalise (L2) un vecteur ou chaque ligne d'une matrice, en float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _category_from_reference(reference: str) -> Optional[str]:
+    """Catégorie d'une référence: ses deux premiers segments (ex: 'ORO.FTL.110' -> 'ORO.FTL')"""
+    if not reference:
+        return None
+    parts = reference.split('.')
+    if len(parts) >= 2:
+        return f"{parts[0]}.{parts[1]}"
+    return reference
+
+
+# Variante ONNX quantifiée int8 publiée avec les modèles sentence-transformers
+ONNX_QINT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Dimensions des modèles recommandés (évite de charger le modèle pour les connaître)
+KNOWN_EMBEDDING_DIMS = {
+    "all-MiniLM-L6-v2": 384,
+    "all-mpnet-base-v2": 768,
+    "paraphrase-multilingual-MiniLM-L12-v2": 384,
+}
+
+# Nombre de lignes lues par bloc lors du chargement de la matrice d'embeddings
+MATRIX_FETCH_SIZE = 512
+
+# Limite de k imposée par les requêtes KNN de sqlite-vec
+VEC_MAX_K = 4096
+
+# Cache sémantique des requêtes : une requête assez proche d'une requête déjà
+# posée (cosinus >= seuil, mêmes paramètres) réutilise ses résultats
+QUERY_CACHE_THRESHOLD = 0.97
+QUERY_CACHE_MAX_ENTRIES = 1024
+QUERY_CACHE_CANDIDATES = 8  # voisins examinés dans vec_query_cache
+
+# Bornes (en tokens estimés) des groupes de longueur pour l'encodage batch :
+# chaque batch est paddé à son texte le plus long, on encode donc par groupe
+# de longueurs voisines, avec des batches plus grands pour les textes courts
+LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512)
+CHARS_PER_TOKEN = 4
+
+# Schéma de la base (tables, index et cache de requêtes)
+# Note: sqlite-vec utilise une extension, on stocke les embeddings en BLOB
+# (l'index vec0 est créé à part, seulement si l'extension est chargée)
+_SCHEMA_SQL = """
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS paragraphs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reference TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    full_text TEXT NOT NULL,
+    paragraph_type TEXT NOT NULL,
+    category TEXT,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS embeddings (
+    id INTEGER PRIMARY KEY,
+    paragraph_id INTEGER NOT NULL,
+    embedding BLOB NOT NULL,
+    model_name TEXT NOT NULL,
+    dtype TEXT NOT NULL DEFAULT 'float32',
+    FOREIGN KEY (paragraph_id) REFERENCES paragraphs(id)
+);
+
+-- Index pour accélérer les recherches
+CREATE INDEX IF NOT EXISTS idx_reference ON paragraphs(reference);
+-- Index couvrant: le filtre par catégorie ne lit que l'index
+CREATE INDEX IF NOT EXISTS idx_cat_id ON paragraphs(category, id);
+CREATE INDEX IF NOT EXISTS idx_paragraph_id ON embeddings(paragraph_id);
+
+-- Cache sémantique des requêtes (embedding normalisé + résultats sérialisés)
+CREATE TABLE IF NOT EXISTS query_cache (
+    qid INTEGER PRIMARY KEY AUTOINCREMENT,
+    embedding BLOB NOT NULL,
+    top_k INTEGER NOT NULL,
+    category_filter TEXT,
+    min_score REAL NOT NULL,
+    results_json TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+COMMIT;
+"""
+
 # Import lazy de sentence_transformers (seulement quand nécessaire)
 _SentenceTransformer = None
 
@@ -62,13 +179,18 @@ class EmbeddingsManager:
     
     Utilise:
     - sentence-transformers pour générer les embeddings
-    - sqlite-vec pour le stockage et la recherche vectorielle
+    - SQLite pour le stockage (embeddings en BLOB)
+    - sqlite-vec (si installé) pour la recherche vectorielle, sinon un scan Python
     """
     
     def __init__(
         self,
         db_path: str = "easa_embeddings.db",
-        model_name: str = "all-MiniLM-L6-v2"
+        model_name: str = "all-MiniLM-L6-v2",
+        encode_backend: str = "torch",
+        onnx_file: Optional[str] = ONNX_QINT8_FILE,
+        query_cache_ttl: int = 0,
+        read_only: bool = False
     ):
         """
         Initialise le gestionnaire d'embeddings.
@@ -80,70 +202,220 @@ class EmbeddingsManager:
                        - 'all-MiniLM-L6-v2': Rapide, 384 dimensions (défaut)
                        - 'all-mpnet-base-v2': Plus précis, 768 dimensions
                        - 'paraphrase-multilingual-MiniLM-L12-v2': Multilingue
+            encode_backend: Backend d'inférence: 'torch' (défaut) ou 'onnx'
+                           (ONNX Runtime, nettement plus rapide sur CPU)
+            onnx_file: Fichier ONNX du modèle à charger avec le backend 'onnx'
+                      (défaut: variante quantifiée int8; None = onnx/model.onnx)
+            query_cache_ttl: Durée de vie (secondes) du cache sémantique des
+                            requêtes stocké dans la base (0 = désactivé)
+            read_only: Ouvrir une base existante pour la recherche seule, sans y
+                      écrire (ni schéma, ni migration, ni WAL, ni cache de requêtes).
+                      Une base non modifiable est aussi ouverte ainsi automatiquement.
         """
         self.db_path = Path(db_path)
         self.model_name = model_name
+        self.encode_backend = encode_backend
+        self.query_cache_ttl = query_cache_ttl
+        self.onnx_file = onnx_file
+        self.read_only = read_only
         
-        print(f"🔧 Chargement du modèle: {model_name}")
-        SentenceTransformer = _get_sentence_transformer()
-        self.model = SentenceTransformer(model_name)
-        self.embedding_dim = self.model.get_sentence_embedding_dimension()
-        print(f"✅ Modèle chargé: {self.embedding_dim} dimensions")
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        # Matrice d'embeddings normalisés pour le scan (chargée à la première recherche)
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._emb_ids: Optional[np.ndarray] = None
+        
+        # État de la base vu par ce gestionnaire, pour détecter les écritures
+        # d'autres connexions (ex: build_embeddings.py pendant que le serveur MCP tourne)
+        self._data_version: Optional[int] = None
+        self._content_fingerprint: Optional[Tuple[int, int, int]] = None
         
         # Initialiser la base de données
+        self._vec_enabled = False
         self._init_database()
     
+    @cached_property
+    def model(self):
+        """Modèle sentence-transformers, chargé au premier encodage"""
+        print(f"🔧 Chargement du modèle: {self.model_name} (backend: {self.encode_backend})")
+        SentenceTransformer = _get_sentence_transformer()
+        if self.encode_backend == "torch":
+            model = SentenceTransformer(self.model_name)
+        else:
+            model_kwargs = {"file_name": self.onnx_file} if self.onnx_file else None
+            model = SentenceTransformer(self.model_name, backend=self.encode_backend, model_kwargs=model_kwargs)
+        print(f"✅ Modèle chargé: {model.get_sentence_embedding_dimension()} dimensions")
+        return model
+    
+    @cached_property
+    def embedding_dim(self) -> int:
+        """
+        Dimension des embeddings, sans charger le modèle si possible:
+        modèle déjà chargé, puis embeddings stockés, puis modèles connus.
+        """
+        if "model" in self.__dict__:
+            return self.model.get_sentence_embedding_dimension()
+        
+        row = self._conn.execute("SELECT embedding, dtype FROM embeddings LIMIT 1").fetchone()
+        if row:
+            return len(row[0]) // np.dtype(row[1]).itemsize
+        
+        if self.model_name in KNOWN_EMBEDDING_DIMS:
+            return KNOWN_EMBEDDING_DIMS[self.model_name]
+        return self.model.get_sentence_embedding_dimension()
+    
+    @staticmethod
+    def _load_vec_extension(conn: sqlite3.Connection) -> bool:
+        """Charge sqlite-vec dans une connexion. Retourne False si indisponible."""
+        if sqlite_vec is None:
+            return False
+        try:
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            return True
+        except (AttributeError, sqlite3.OperationalError):
+            # Python compilé sans support des extensions SQLite
+            return False
+    
     def _init_database(self):
-        """Initialise la base de données SQLite avec sqlite-vec"""
-        conn = sqlite3.connect(str(self.db_path))
+        """
+        Ouvre la connexion persistante et initialise le schéma
+        (et l'index sqlite-vec si disponible).
+        """
+        if not self.read_only:
+            # Une seule connexion pour toute la durée de vie du gestionnaire
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            try:
+                self._init_schema(self._conn)
+            except sqlite3.OperationalError as e:
+                # Fichier en lecture seule, ou base verrouillée par une autre connexion :
+                # la recherche reste possible sans rien écrire
+                print(f"⚠️  Base non modifiable ({e}), ouverture en lecture seule")
+                self._conn.close()
+                self._vec_enabled = False
+                self.read_only = True
+        if self.read_only:
+            self._init_read_only_database()
         
-        # Créer la table principale pour les paragraphes
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS paragraphs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                reference TEXT NOT NULL UNIQUE,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                full_text TEXT NOT NULL,
-                paragraph_type TEXT NOT NULL,
-                category TEXT,
-                metadata TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        self._data_version = self._read_data_version()
+        self._content_fingerprint = self._read_content_fingerprint()
         
-        # Créer la table pour les embeddings
-        # Note: sqlite-vec utilise une extension, on stocke les embeddings en BLOB
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS embeddings (
-                id INTEGER PRIMARY KEY,
-                paragraph_id INTEGER NOT NULL,
-                embedding BLOB NOT NULL,
-                model_name TEXT NOT NULL,
-                FOREIGN KEY (paragraph_id) REFERENCES paragraphs(id)
+        mode = " (lecture seule)" if self.read_only else ""
+        print(f"✅ Base de données initialisée{mode}: {self.db_path}")
+    
+    @staticmethod
+    def _set_connection_pragmas(conn: sqlite3.Connection):
+        """Réglages propres à la connexion (rien n'est écrit dans le fichier)"""
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+    
+    def _init_schema(self, conn: sqlite3.Connection):
+        """Connexion en écriture : WAL, schéma, migrations et index sqlite-vec"""
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._set_connection_pragmas(conn)
+            
+            # Schéma complet en un seul script (une transaction)
+            conn.executescript(_SCHEMA_SQL)
+            
+            # Bases créées avant la colonne dtype : leurs embeddings sont en float32
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            if "dtype" not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+            
+            if self._load_vec_extension(conn):
+                try:
+                    self._init_vec_index(conn)
+                    self._vec_enabled = True
+                except sqlite3.OperationalError as e:
+                    if "readonly" in str(e) or "locked" in str(e):
+                        raise
+                    print(f"⚠️  Index sqlite-vec indisponible ({e}), recherche par scan")
+            
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+            raise
+    
+    def _init_read_only_database(self):
+        """Connexion en lecture seule sur une base existante (aucune écriture)"""
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        conn = self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._set_connection_pragmas(conn)
+        
+        # Le cache de requêtes écrit dans la base
+        self.query_cache_ttl = 0
+        
+        # Base antérieure à la colonne dtype : vue temporaire (en mémoire) qui
+        # masque la table et expose ses embeddings comme float32
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            conn.execute("""
+                CREATE TEMP VIEW embeddings AS
+                SELECT id, paragraph_id, embedding, model_name, 'float32' AS dtype FROM main.embeddings
+            """)
+        
+        # Index sqlite-vec utilisé seulement s'il existe et couvre tous les embeddings
+        if self._load_vec_extension(conn):
+            try:
+                indexed, stored = conn.execute("""
+                    SELECT (SELECT COUNT(*) FROM vec_embeddings), (SELECT COUNT(*) FROM embeddings)
+                """).fetchone()
+                self._vec_enabled = indexed == stored
+            except sqlite3.OperationalError:
+                pass  # pas d'index vec0 dans cette base
+    
+    def _init_vec_index(self, conn: sqlite3.Connection):
+        """Crée la table virtuelle vec0 et la synchronise avec la table embeddings"""
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS vec_embeddings USING vec0(
+                paragraph_id INTEGER PRIMARY KEY,
+                embedding FLOAT[{self.embedding_dim}] distance_metric=cosine
             )
         """)
         
-        # Index pour accélérer les recherches
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_reference 
-            ON paragraphs(reference)
-        """)
+        # Base construite sans sqlite-vec : indexer les embeddings manquants
+        missing = conn.execute("""
+            SELECT paragraph_id, embedding, dtype FROM embeddings
+            WHERE paragraph_id NOT IN (SELECT paragraph_id FROM vec_embeddings)
+        """).fetchall()
+        if missing:
+            ids, blobs, dtypes = zip(*missing)
+            vectors = _decode_embeddings(blobs, dtypes)
+            conn.executemany(
+                "INSERT INTO vec_embeddings (paragraph_id, embedding) VALUES (?, ?)",
+                ((pid, vector.tobytes()) for pid, vector in zip(ids, vectors))
+            )
         
+        # Entrées orphelines (base vidée sans l'extension chargée)
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_category 
-            ON paragraphs(category)
+            DELETE FROM vec_embeddings
+            WHERE paragraph_id NOT IN (SELECT paragraph_id FROM embeddings)
         """)
         
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_paragraph_id 
-            ON embeddings(paragraph_id)
+        # Index du cache de requêtes : désynchronisé = on repart d'un cache vide
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS vec_query_cache USING vec0(
+                qid INTEGER PRIMARY KEY,
+                embedding FLOAT[{self.embedding_dim}] distance_metric=cosine
+            )
         """)
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ Base de données initialisée: {self.db_path}")
+        cached = conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+        indexed = conn.execute("SELECT COUNT(*) FROM vec_query_cache").fetchone()[0]
+        if cached != indexed:
+            conn.execute("DELETE FROM query_cache")
+            conn.execute("DELETE FROM vec_query_cache")
+    
+    def _index_embedding(self, cursor: sqlite3.Cursor, paragraph_id: int, embedding: np.ndarray):
+        """Ajoute un embedding à l'index sqlite-vec (si activé, toujours en float32)"""
+        if self._vec_enabled:
+            cursor.execute(
+                "INSERT INTO vec_embeddings (paragraph_id, embedding) VALUES (?, ?)",
+                (paragraph_id, embedding.astype(np.float32).tobytes())
+            )
     
     def add_paragraph(
         self,
@@ -156,15 +428,17 @@ class EmbeddingsManager:
         Args:
             paragraph: Objet Topic à ajouter
             generate_embedding: Si True, génère l'embedding automatiquement
-            
+        
         Returns:
             ID du paragraphe dans la base de données
         """
-        conn = sqlite3.connect(str(self.db_path))
+        self._invalidate_embedding_matrix()
+        conn = self._conn
+        self._clear_query_cache()
         cursor = conn.cursor()
         
         # Extraire la catégorie
-        category = paragraph.reference.rsplit('.', 1)[0] if '.' in paragraph.reference else None
+        category = _category_from_reference(paragraph.reference)
         
         # Préparer les données
         full_text = paragraph.get_full_text()
@@ -189,28 +463,31 @@ class EmbeddingsManager:
             
             # Générer et stocker l'embedding
             if generate_embedding:
-                embedding = self.model.encode(full_text, convert_to_numpy=True)
-                embedding_blob = embedding.astype(np.float32).tobytes()
+                embedding = _l2_normalize(self.model.encode(full_text, convert_to_numpy=True))
+                embedding_blob = embedding.astype(EMBEDDING_DTYPE).tobytes()
                 
                 cursor.execute("""
-                    INSERT INTO embeddings (paragraph_id, embedding, model_name)
-                    VALUES (?, ?, ?)
-                """, (paragraph_id, embedding_blob, self.model_name))
+                    INSERT INTO embeddings (paragraph_id, embedding, model_name, dtype)
+                    VALUES (?, ?, ?, ?)
+                """, (paragraph_id, embedding_blob, self.model_name, EMBEDDING_DTYPE))
+                self._index_embedding(cursor, paragraph_id, embedding)
             
             conn.commit()
             return paragraph_id
-            
+        
         except sqlite3.IntegrityError:
             # Le paragraphe existe déjà
+            conn.rollback()
             cursor.execute(
                 "SELECT id FROM paragraphs WHERE reference = ?",
                 (paragraph.reference,)
             )
             paragraph_id = cursor.fetchone()[0]
             return paragraph_id
-            
-        finally:
-            conn.close()
+        
+        except Exception:
+            conn.rollback()
+            raise
     
     def add_paragraphs_batch(
         self,
@@ -225,77 +502,112 @@ class EmbeddingsManager:
             paragraphs: Liste de paragraphes à ajouter
             batch_size: Taille des batches pour l'encodage
             show_progress: Afficher la barre de progression
-            
+        
         Returns:
             Nombre de paragraphes ajoutés
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        added_count = 0
-        iterator = tqdm(paragraphs, desc="Ajout des paragraphes") if show_progress else paragraphs
+        self._invalidate_embedding_matrix()
+        conn = self._conn
+        self._clear_query_cache()
         
         # Préparer tous les textes pour l'encodage batch
         texts = [p.get_full_text() for p in paragraphs]
         
         # Générer tous les embeddings en batch (beaucoup plus rapide)
         print(f"🔄 Génération des embeddings pour {len(texts)} paragraphes...")
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True
-        )
+        embeddings = _l2_normalize(self._encode_bucketed(texts, batch_size, show_progress))
         
-        # Insérer les paragraphes et embeddings
-        for paragraph, embedding in zip(iterator, embeddings):
-            try:
-                # Extraire la catégorie
-                category = None
-                if paragraph.reference:
-                    parts = paragraph.reference.split('.')
-                    if len(parts) >= 2:
-                        category = f"{parts[0]}.{parts[1]}"
-                    else:
-                        category = paragraph.reference
-                
-                full_text = paragraph.get_full_text()
-                metadata_json = json.dumps(paragraph.metadata)
-                
-                # Insérer le paragraphe
-                cursor.execute("""
-                    INSERT INTO paragraphs (reference, title, content, full_text, paragraph_type, category, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    paragraph.reference,
-                    paragraph.title,
-                    paragraph.content,
-                    full_text,
-                    paragraph.topic_type.value,
-                    category,
-                    metadata_json
-                ))
-                
-                paragraph_id = cursor.lastrowid
-                
-                # Insérer l'embedding
-                embedding_blob = embedding.astype(np.float32).tobytes()
-                cursor.execute("""
-                    INSERT INTO embeddings (paragraph_id, embedding, model_name)
-                    VALUES (?, ?, ?)
-                """, (paragraph_id, embedding_blob, self.model_name))
-                
-                added_count += 1
-                
-            except sqlite3.IntegrityError:
-                # Paragraphe déjà existant, on passe
-                continue
+        # Préparer les lignes à insérer (texte complet déjà calculé pour l'encodage)
+        references = [p.reference for p in paragraphs]
+        categories = [_category_from_reference(ref) for ref in references]
+        metadatas = [json.dumps(p.metadata) for p in paragraphs]
+        para_rows = [
+            (ref, p.title, p.content, text, p.topic_type.value, category, metadata_json)
+            for ref, p, text, category, metadata_json
+            in zip(references, paragraphs, texts, categories, metadatas)
+        ]
+        blobs = embeddings.astype(EMBEDDING_DTYPE)
+        emb_rows = [
+            (blob.tobytes(), self.model_name, EMBEDDING_DTYPE, ref)
+            for blob, ref in zip(blobs, references)
+        ]
         
-        conn.commit()
-        conn.close()
+        # Une seule transaction : les doublons sont ignorés par SQLite
+        # plutôt que par une exception Python par ligne
+        with conn:
+            last_emb_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM embeddings").fetchone()[0]
+            
+            cursor = conn.executemany("""
+                INSERT OR IGNORE INTO paragraphs (reference, title, content, full_text, paragraph_type, category, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, para_rows)
+            added_count = cursor.rowcount
+            
+            # Un embedding uniquement pour les paragraphes qui n'en ont pas encore
+            conn.executemany("""
+                INSERT INTO embeddings (paragraph_id, embedding, model_name, dtype)
+                SELECT p.id, ?, ?, ? FROM paragraphs p
+                WHERE p.reference = ?
+                  AND NOT EXISTS (SELECT 1 FROM embeddings e WHERE e.paragraph_id = p.id)
+            """, emb_rows)
+            
+            if self._vec_enabled:
+                # Première occurrence d'une référence = celle réellement insérée
+                vectors = {}
+                for ref, embedding in zip(references, embeddings):
+                    vectors.setdefault(ref, embedding)
+                new_rows = conn.execute("""
+                    SELECT e.paragraph_id, p.reference FROM embeddings e
+                    JOIN paragraphs p ON e.paragraph_id = p.id
+                    WHERE e.id > ?
+                """, (last_emb_id,)).fetchall()
+                cursor = conn.cursor()
+                for paragraph_id, reference in new_rows:
+                    self._index_embedding(cursor, paragraph_id, vectors[reference])
         
         return added_count
     
+    def _encode_bucketed(self, texts: List[str], batch_size: int, show_progress: bool) -> np.ndarray:
+        """
+        Encode des textes groupés par longueur, résultats dans l'ordre d'origine.
+        
+        Args:
+            texts: Textes à encoder
+            batch_size: Taille des batches pour les textes longs (>= 128 tokens)
+            show_progress: Afficher la barre de progression
+        
+        Returns:
+            Matrice (len(texts), embedding_dim)
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        
+        # Longueur en tokens estimée à partir du nombre de caractères
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind="stable")
+        bucket_of = np.searchsorted(
+            np.array(LENGTH_BUCKETS) * CHARS_PER_TOKEN, lengths[order], side="left"
+        )
+        
+        chunks = []
+        bucket_ids = np.unique(bucket_of)
+        iterator = tqdm(bucket_ids, desc="Encodage par longueur") if show_progress else bucket_ids
+        for bucket in iterator:
+            indices = order[bucket_of == bucket]
+            max_tokens = LENGTH_BUCKETS[min(bucket, len(LENGTH_BUCKETS) - 1)]
+            # Budget de tokens par batch constant : les textes courts passent par gros batches
+            bucket_batch_size = max(batch_size, batch_size * 128 // max_tokens)
+            chunks.append(self.model.encode(
+                [texts[i] for i in indices],
+                batch_size=bucket_batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            ))
+        
+        # Remettre les embeddings dans l'ordre des textes
+        inverse = np.argsort(order)
+        return np.concatenate(chunks)[inverse]
+    
     def search(
         self,
         query: str,
@@ -311,72 +623,319 @@ class EmbeddingsManager:
             top_k: Nombre de résultats à retourner
             category_filter: Filtrer par catégorie (ex: "ORO.FTL")
             min_score: Score minimum de similarité (0-1)
-            
+        
         Returns:
             Liste de SearchResult triée par similarité décroissante
         """
-        # Générer l'embedding de la requête
-        query_embedding = self.model.encode(query, convert_to_numpy=True)
+        # Générer l'embedding de la requête (normalisé une fois pour toutes)
+        query_vec = _l2_normalize(self.model.encode(query, convert_to_numpy=True))
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        # Base modifiée par une autre connexion : matrice et cache de requêtes périmés
+        self._sync_with_database()
         
-        # Récupérer tous les embeddings (avec filtre optionnel)
+        if self.query_cache_ttl <= 0:
+            return self._search_embedding(query_vec, top_k, category_filter, min_score)
+        
+        # Requête proche déjà posée avec les mêmes paramètres : résultats en cache
+        cached = self._lookup_query_cache(query_vec, top_k, category_filter, min_score)
+        if cached is not None:
+            return cached
+        
+        results = self._search_embedding(query_vec, top_k, category_filter, min_score)
+        self._store_query_cache(query_vec, top_k, category_filter, min_score, results)
+        return results
+    
+    def _search_embedding(
+        self,
+        query_vec: np.ndarray,
+        top_k: int,
+        category_filter: Optional[str],
+        min_score: float
+    ) -> List[SearchResult]:
+        """Recherche à partir de l'embedding normalisé de la requête (sans cache)"""
+        # k-NN natif via sqlite-vec (le filtre par catégorie passe par le scan)
+        if self._vec_enabled and not category_filter and top_k <= VEC_MAX_K:
+            return self._search_vec(query_vec, top_k, min_score)
+        
+        # Scan vectorisé : un seul produit matrice-vecteur sur la matrice en cache
+        self._load_embedding_matrix()
+        if len(self._emb_ids) == 0:
+            return []
+        
+        # Filtre par catégorie : ids résolus par SQL (index couvrant), puis
+        # produit matrice-vecteur sur les seules lignes correspondantes
         if category_filter:
-            cursor.execute("""
-                SELECT p.id, p.reference, p.title, p.content, p.paragraph_type, 
-                       p.category, p.metadata, e.embedding
-                FROM paragraphs p
-                JOIN embeddings e ON p.id = e.paragraph_id
-                WHERE p.category = ?
-            """, (category_filter,))
+            category_ids = np.fromiter(
+                (row[0] for row in self._conn.execute(
+                    "SELECT id FROM paragraphs WHERE category = ?", (category_filter,)
+                )),
+                dtype=np.int64
+            )
+            rows = np.flatnonzero(np.isin(self._emb_ids, category_ids))
+            candidate_ids = self._emb_ids[rows]
+            scores = self._emb_matrix[rows] @ query_vec
         else:
-            cursor.execute("""
-                SELECT p.id, p.reference, p.title, p.content, p.paragraph_type,
-                       p.category, p.metadata, e.embedding
-                FROM paragraphs p
-                JOIN embeddings e ON p.id = e.paragraph_id
-            """)
+            candidate_ids = self._emb_ids
+            scores = self._emb_matrix @ query_vec
         
-        results = []
-        for row in cursor.fetchall():
-            pid, reference, title, content, ptype, category, metadata_json, embedding_blob = row
-            
-            # Reconstruire l'embedding
-            embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-            
-            # Calculer la similarité cosinus
-            similarity = self._cosine_similarity(query_embedding, embedding)
+        # Sélection des top_k en O(N) (argpartition), puis tri de ces k seulement
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] >= min_score]
+        
+        return self._fetch_results(candidate_ids[top], scores[top])
+    
+    def _load_embedding_matrix(self):
+        """
+        Charge tous les embeddings dans une matrice (N, D) float32 L2-normalisée.
+        
+        La matrice est gardée en cache et invalidée à chaque écriture, de ce
+        gestionnaire ou d'une autre connexion (voir `_sync_with_database`).
+        """
+        if self._emb_matrix is not None:
+            return
+        
+        conn = self._conn
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        
+        # Lecture par blocs dans une matrice pré-allouée: jamais tous les BLOBs en mémoire
+        ids = np.empty(count, dtype=np.int64)
+        matrix = np.empty((count, self.embedding_dim), dtype=np.float32)
+        cursor = conn.execute("SELECT paragraph_id, embedding, dtype FROM embeddings")
+        filled = 0
+        while True:
+            rows = cursor.fetchmany(MATRIX_FETCH_SIZE)
+            if not rows:
+                break
+            chunk_ids, blobs, dtypes = zip(*rows)
+            # Normalisés à l'insertion; renormaliser couvre les lignes anciennes
+            # et l'arrondi float16
+            chunk = _l2_normalize(_decode_embeddings(blobs, dtypes))
             
-            # Filtrer par score minimum
+            end = filled + len(rows)
+            if end > len(ids):
+                # Lignes ajoutées par un autre processus depuis le COUNT
+                ids = np.concatenate([ids, np.empty(end - len(ids), dtype=np.int64)])
+                matrix = np.concatenate([matrix, np.empty((end - len(matrix), matrix.shape[1]), dtype=np.float32)])
+            ids[filled:end] = chunk_ids
+            matrix[filled:end] = chunk
+            filled = end
+        
+        self._emb_ids = ids[:filled]
+        self._emb_matrix = matrix[:filled]
+    
+    def _invalidate_embedding_matrix(self):
+        """Invalide la matrice d'embeddings en cache (après une écriture)"""
+        self._emb_matrix = None
+    
+    def _read_data_version(self) -> int:
+        """PRAGMA data_version : change quand une AUTRE connexion a modifié la base"""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _read_content_fingerprint(self) -> Tuple[int, int, int]:
+        """Empreinte du contenu indexé : (nb d'embeddings, max id embeddings, max id paragraphes)"""
+        return self._conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM embeddings),
+                (SELECT IFNULL(MAX(id), 0) FROM embeddings),
+                (SELECT IFNULL(MAX(id), 0) FROM paragraphs)
+        """).fetchone()
+    
+    def _sync_with_database(self):
+        """
+        Invalide la matrice et vide le cache de requêtes si une autre connexion
+        a modifié les paragraphes ou les embeddings depuis le dernier contrôle.
+        
+        data_version ne coûte rien et filtre le cas courant ; l'empreinte du
+        contenu évite de tout invalider quand l'autre connexion n'a touché
+        qu'au cache de requêtes.
+        """
+        data_version = self._read_data_version()
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        
+        fingerprint = self._read_content_fingerprint()
+        if fingerprint == self._content_fingerprint:
+            return
+        self._content_fingerprint = fingerprint
+        
+        self._invalidate_embedding_matrix()
+        try:
+            with self._conn:
+                self._clear_query_cache()
+        except sqlite3.OperationalError:
+            # Base en lecture seule ou verrouillée : cache impossible à purger, donc désactivé
+            self.query_cache_ttl = 0
+    
+    def _fetch_results(self, paragraph_ids: np.ndarray, scores: np.ndarray) -> List[SearchResult]:
+        """Construit les SearchResult des paragraphes donnés, dans l'ordre fourni"""
+        if len(paragraph_ids) == 0:
+            return []
+        
+        ids = [int(pid) for pid in paragraph_ids]
+        placeholders = ",".join("?" * len(ids))
+        rows = self._conn.execute(f"""
+            SELECT id, reference, title, content, paragraph_type, metadata
+            FROM paragraphs
+            WHERE id IN ({placeholders})
+        """, ids).fetchall()
+        
+        by_id = {row[0]: row[1:] for row in rows}
+        results = []
+        for pid, score in zip(ids, scores):
+            reference, title, content, ptype, metadata_json = by_id[pid]
+            metadata = json.loads(metadata_json) if metadata_json else {}
+            results.append(SearchResult(
+                reference=reference,
+                title=title,
+                content=content,
+                score=float(score),
+                metadata=metadata,
+                paragraph_type=ptype
+            ))
+        
+        return results
+    
+    def _search_vec(self, query_embedding: np.ndarray, top_k: int, min_score: float) -> List[SearchResult]:
+        """Recherche des top_k plus proches voisins avec l'index sqlite-vec"""
+        rows = self._conn.execute("""
+            SELECT p.reference, p.title, p.content, p.paragraph_type, p.metadata, v.distance
+            FROM (
+                SELECT paragraph_id, distance FROM vec_embeddings
+                WHERE embedding MATCH ? AND k = ?
+            ) v
+            JOIN paragraphs p ON p.id = v.paragraph_id
+            ORDER BY v.distance
+        """, (query_embedding.astype(np.float32).tobytes(), top_k)).fetchall()
+        
+        results = []
+        for reference, title, content, ptype, metadata_json, distance in rows:
+            # Distance cosinus -> similarité
+            similarity = 1.0 - distance
             if similarity < min_score:
                 continue
             
-            # Créer le résultat
             metadata = json.loads(metadata_json) if metadata_json else {}
-            result = SearchResult(
+            results.append(SearchResult(
                 reference=reference,
                 title=title,
                 content=content,
                 score=float(similarity),
                 metadata=metadata,
                 paragraph_type=ptype
-            )
-            results.append(result)
+            ))
+        
+        return results
+    
+    def _lookup_query_cache(
+        self,
+        query_vec: np.ndarray,
+        top_k: int,
+        category_filter: Optional[str],
+        min_score: float
+    ) -> Optional[List[SearchResult]]:
+        """Cherche une requête en cache assez similaire (None si aucune)"""
+        min_created = time.time() - self.query_cache_ttl
         
-        conn.close()
+        if self._vec_enabled:
+            row = self._conn.execute("""
+                SELECT c.results_json
+                FROM (
+                    SELECT qid, distance FROM vec_query_cache
+                    WHERE embedding MATCH ? AND k = ?
+                ) v
+                JOIN query_cache c ON c.qid = v.qid
+                WHERE v.distance <= ?
+                  AND c.top_k = ? AND c.category_filter IS ? AND c.min_score = ?
+                  AND c.created_at >= ?
+                ORDER BY v.distance
+                LIMIT 1
+            """, (
+                query_vec.tobytes(), QUERY_CACHE_CANDIDATES, 1.0 - QUERY_CACHE_THRESHOLD,
+                top_k, category_filter, min_score, min_created
+            )).fetchone()
+            results_json = row[0] if row else None
+        else:
+            # Sans sqlite-vec : le cache est petit, un produit matrice-vecteur suffit
+            rows = self._conn.execute("""
+                SELECT embedding, results_json FROM query_cache
+                WHERE top_k = ? AND category_filter IS ? AND min_score = ?
+                  AND created_at >= ?
+            """, (top_k, category_filter, min_score, min_created)).fetchall()
+            results_json = None
+            if rows:
+                blobs, payloads = zip(*rows)
+                similarities = _decode_embeddings(blobs, ["float32"] * len(blobs)) @ query_vec
+                best = int(np.argmax(similarities))
+                if similarities[best] >= QUERY_CACHE_THRESHOLD:
+                    results_json = payloads[best]
         
-        # Trier par score décroissant et limiter
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:top_k]
+        if results_json is None:
+            return None
+        return [SearchResult(**item) for item in json.loads(results_json)]
+    
+    def _store_query_cache(
+        self,
+        query_vec: np.ndarray,
+        top_k: int,
+        category_filter: Optional[str],
+        min_score: float,
+        results: List[SearchResult]
+    ):
+        """Enregistre les résultats d'une requête et purge les entrées périmées"""
+        conn = self._conn
+        now = time.time()
+        try:
+            with conn:
+                cursor = conn.execute("""
+                    INSERT INTO query_cache
+                        (embedding, top_k, category_filter, min_score, results_json, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    query_vec.tobytes(), top_k, category_filter, min_score,
+                    json.dumps([asdict(r) for r in results]), now
+                ))
+                qid = cursor.lastrowid
+                if self._vec_enabled:
+                    conn.execute(
+                        "INSERT INTO vec_query_cache (qid, embedding) VALUES (?, ?)",
+                        (qid, query_vec.tobytes())
+                    )
+                
+                # Éviction paresseuse : entrées expirées et plus anciennes au-delà du maximum
+                evicted = conn.execute("""
+                    DELETE FROM query_cache WHERE created_at < ? OR qid <= ?
+                """, (now - self.query_cache_ttl, qid - QUERY_CACHE_MAX_ENTRIES)).rowcount
+                if evicted and self._vec_enabled:
+                    conn.execute("""
+                        DELETE FROM vec_query_cache
+                        WHERE qid NOT IN (SELECT qid FROM query_cache)
+                    """)
+        except sqlite3.OperationalError:
+            # Base en lecture seule ou verrouillée : la recherche reste valide sans cache
+            pass
+    
+    def _clear_query_cache(self):
+        """Vide le cache des requêtes (les résultats dépendent du contenu de la base)"""
+        conn = self._conn
+        conn.execute("DELETE FROM query_cache")
+        if self._vec_enabled:
+            conn.execute("DELETE FROM vec_query_cache")
     
     def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calcule la similarité cosinus entre deux vecteurs"""
-        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+        """Calcule la similarité cosinus entre deux vecteurs déjà normalisés"""
+        return float(np.dot(a, b))
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques de la base de données"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = self._conn
         cursor = conn.cursor()
         
         # Nombre total de paragraphes
@@ -399,8 +958,6 @@ class EmbeddingsManager:
         # Taille de la base de données
         db_size = self.db_path.stat().st_size / (1024 * 1024)  # MB
         
-        conn.close()
-        
         return {
             "total_paragraphs": total_paragraphs,
             "total_embeddings": total_embeddings,
@@ -412,13 +969,27 @@ class EmbeddingsManager:
     
     def clear_database(self):
         """Vide complètement la base de données"""
-        conn = sqlite3.connect(str(self.db_path))
+        self._invalidate_embedding_matrix()
+        conn = self._conn
+        self._clear_query_cache()
+        if self._vec_enabled:
+            conn.execute("DELETE FROM vec_embeddings")
         conn.execute("DELETE FROM embeddings")
         conn.execute("DELETE FROM paragraphs")
         conn.commit()
-        conn.close()
         print("✅ Base de données vidée")
     
+    def close(self):
+        """Ferme la connexion à la base de données"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def __del__(self):
+        # getattr: __init__ peut avoir échoué avant l'ouverture de la connexion
+        if getattr(self, "_conn", None) is not None:
+            self.close()
+    
     def export_to_json(self, output_path: str, category_filter: Optional[str] = None):
         """
         Exporte les paragraphes en JSON (sans les embeddings).
@@ -427,7 +998,7 @@ class EmbeddingsManager:
             output_path: Chemin du fichier JSON de sortie
             category_filter: Filtrer par catégorie (optionnel)
         """
-        conn = sqlite3.connect(str(self.db_path))
+        conn = self._conn
         cursor = conn.cursor()
         
         if category_filter:
@@ -454,8 +1025,6 @@ class EmbeddingsManager:
                 "metadata": json.loads(metadata_json) if metadata_json else {}
             })
         
-        conn.close()
-        
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump({
                 "metadata": {
@@ -485,7 +1054,7 @@ def build_embeddings_database(
         model_name: Modèle sentence-transformers à utiliser
         pattern: Pattern regex pour filtrer les paragraphes (optionnel)
         batch_size: Taille des batches pour l'encodage
-        
+    
     Returns:
         Instance de EmbeddingsManager
     """
@@ -497,21 +1066,21 @@ def build_embeddings_database(
     print(f"\n📖 Chargement du document XML...")
     parser = EASAParser(xml_path)
     
-    # Obtenir la table des matières
-    print(f"\n📋 Extraction de la table des matières...")
+    # Extraire les topics (filtrés par référence si un pattern est donné)
+    print(f"\n📋 Extraction des topics...")
     if pattern:
         print(f"   Pattern: {pattern}")
-    toc = parser.get_table_of_contents(pattern=pattern)
-    print(f"✅ {len(toc)} paragraphes à traiter")
+    topics = parser.get_all_topics(pattern=pattern, show_progress=True)
+    print(f"✅ {len(topics)} paragraphes à traiter")
     
     # Vérifier si des paragraphes ont été trouvés
-    if len(toc) == 0:
+    if len(topics) == 0:
         print("\n⚠️  ATTENTION: Aucun paragraphe trouvé avec ce pattern!")
         if pattern:
             print(f"   Pattern utilisé: {pattern}")
         print("\n📋 Catégories disponibles dans le document:")
-        categories = parser.get_categories()
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:20]:
+        categories = parser.get_statistics()["by_category"]
+        for cat, count in categories.items():
             print(f"   • {cat}: {count} paragraphes")
         print("\n💡 Suggestion: Utilisez --category avec une catégorie de la liste ci-dessus")
         print("   Exemple: --category 'ORO.FTL' ou --category 'ORO.GEN'")
@@ -521,14 +1090,8 @@ def build_embeddings_database(
     print(f"\n🔧 Initialisation du gestionnaire d'embeddings...")
     manager = EmbeddingsManager(db_path=db_path, model_name=model_name)
     
-    # Extraire tous les paragraphes
-    print(f"\n📦 Extraction des paragraphes...")
-    paragraphs = []
-    for item in tqdm(toc, desc="Extraction"):
-        paragraph = parser.extract_paragraph(item['reference'])
-        if paragraph:
-            paragraphs.append(paragraph)
-    
+    # Ignorer les topics complètement vides (ni référence, ni titre, ni contenu)
+    paragraphs = [t for t in topics if t.reference or t.title or t.content]
     print(f"✅ {len(paragraphs)} paragraphes extraits")
     
     # Ajouter à la base de données
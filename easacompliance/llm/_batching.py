@@ -0,0 +1,133 @@
+"""
+Micro-batching for the custom LLM clients
+=========================================
+
+Prompts submitted from many threads (one per CrewAI agent) are coalesced
+for up to `window_ms`, or until `max_batch_size` are queued, and handed
+to a single dispatch coroutine running on a private event loop.
+
+Prompts are first binned by estimated length so that a batch never mixes
+short prompts with one that is orders of magnitude longer.
+"""
+
+import asyncio
+import bisect
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Bin upper bounds, in estimated input tokens
+DEFAULT_BIN_EDGES = (512, 2048, 8192, 32768)
+
+
+def _estimate_prompt_tokens(payload: Dict[str, Any]) -> int:
+    """Cheap token estimate of a chat payload (~4 characters per token)."""
+    return sum(len(message.get("content") or "") for message in payload.get("messages", ())) // 4
+
+
+class _PromptBatcher:
+    """Coalesce concurrent requests into batches dispatched on a background loop.
+    
+    `dispatch` receives the list of queued payloads and must return one
+    result (or exception instance) per payload, in the same order.
+    """
+    
+    def __init__(
+        self,
+        dispatch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window_ms: float = 10,
+        max_batch_size: int = 32,
+        bin_edges: Sequence[int] = DEFAULT_BIN_EDGES,
+        estimate: Callable[[Any], int] = _estimate_prompt_tokens
+    ):
+        self._dispatch = dispatch
+        self._window = window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._bin_edges = sorted(bin_edges)
+        self._estimate = estimate
+        
+        self._loop = asyncio.new_event_loop()
+        self._queues: List["asyncio.Queue"] = []
+        self._on_close: Optional[Callable[[], Awaitable[Any]]] = None
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+    
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        # One queue (and worker) per length bin, drained independently
+        for _ in range(len(self._bin_edges) + 1):
+            queue = asyncio.Queue()
+            self._queues.append(queue)
+            self._loop.create_task(self._worker(queue))
+        ready.set()
+        self._loop.run_forever()
+        
+        # Stopped by close(): cancel the worker and any batch still in flight
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        if self._on_close is not None:
+            self._loop.run_until_complete(asyncio.gather(self._on_close(), return_exceptions=True))
+        self._loop.close()
+    
+    def submit(self, payload: Any) -> Future:
+        """Queue a payload; the returned future resolves to its result."""
+        future = Future()
+        queue = self._queues[bisect.bisect_left(self._bin_edges, self._estimate(payload))]
+        self._loop.call_soon_threadsafe(queue.put_nowait, (payload, future))
+        return future
+    
+    async def _worker(self, queue: "asyncio.Queue"):
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self._window
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without blocking the collection of the next batch
+            self._loop.create_task(self._dispatch_batch(batch))
+    
+    async def _dispatch_batch(self, batch: List[Any]):
+        payloads = [payload for payload, _ in batch]
+        try:
+            results = await self._dispatch(payloads)
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the batcher loop and wait (at most `timeout` s) for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    
+    def close(self, on_close: Optional[Callable[[], Awaitable[Any]]] = None):
+        """Stop the background loop, running `on_close()` on it once the workers are cancelled.
+        
+        Safe to call more than once and from the loop thread itself (e.g. from a
+        finalizer), in which case the thread is not joined.
+        """
+        if self._loop.is_closed():
+            return
+        self._on_close = on_close
+        try:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        except RuntimeError:
+            return  # loop closed in the meantime
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=1)
@@ -0,0 +1,752 @@
+"""
+Shared base for OpenAI-compatible chat/completions clients
+==========================================================
+
+HyperbolicLLM and OllamaLLM both talk to an OpenAI-compatible
+`/chat/completions` endpoint. Everything that does not depend on the
+provider lives here: the pooled HTTP session, retries, tool conversion,
+streaming, batching and tool-call handling.
+
+Subclasses only set their defaults (timeout, max_tokens, context window)
+and the provider name used in error messages.
+"""
+
+from crewai import BaseLLM
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+import gzip
+import inspect
+import importlib.util
+import requests
+import json
+import time
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+import random
+import re
+import logging
+import threading
+import weakref
+from email.utils import parsedate_to_datetime
+
+# Fast JSON (optional): orjson encodes/decodes large payloads much faster
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+    _Fragment = getattr(orjson, "Fragment", None)  # orjson >= 3.9
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode()
+    _loads = json.loads
+    _Fragment = None
+
+# httpx (optional): concurrent calls for acall_batch, over HTTP/2 when h2 is installed
+try:
+    import httpx
+except ImportError:
+    httpx = None
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+from ._batching import DEFAULT_BIN_EDGES, _PromptBatcher
+
+logger = logging.getLogger(__name__)
+
+# With compress_requests=True, bodies larger than this (in bytes) are sent gzip-compressed
+GZIP_MIN_BYTES = 4096
+
+# Errors to a compressed body meaning the server does not decode it: 415, or a 400
+# about the body encoding (servers without request decompression fail to parse it).
+# Other 400s (context length, tool schema, unknown model...) are real request errors
+_GZIP_UNDECODED_BODY = re.compile(
+    r"gzip|content.encoding|decod|invalid json|malformed|not valid json|utf-?8|unicode",
+    re.IGNORECASE
+)
+
+
+def _gzip_refused_by(response: Union[requests.Response, "httpx.Response"]) -> bool:
+    """True if the response to a compressed body means gzip is not supported."""
+    if response.status_code == 415:
+        return True
+    # Error body only read for a 400 (a successful response may be streamed)
+    return response.status_code == 400 and _GZIP_UNDECODED_BODY.search(response.text) is not None
+
+# Endpoints that refused a compressed body: sent uncompressed from then on
+_gzip_refused: Set[str] = set()
+
+
+def _weak_dispatch(llm: "_OpenAICompatibleLLM"):
+    """Batch dispatch holding only a weak reference to its client.
+    
+    The batcher thread is always alive: a bound method would keep the client
+    (and so the thread, its loop and httpx client) from ever being collected.
+    """
+    method = weakref.WeakMethod(llm._dispatch_batch)
+    
+    async def dispatch(payloads: List[Dict[str, Any]]) -> List[Any]:
+        bound = method()
+        if bound is None:
+            raise RuntimeError("LLM client was garbage-collected")
+        return await bound(payloads)
+    
+    return dispatch
+
+
+def _tool_specs(tools: List[Any]) -> Tuple[Tuple[str, str, Any], ...]:
+    """Cache key of a CrewAI tool list: (name, description, schema class)."""
+    return tuple(
+        (tool.name, tool.description, getattr(tool, "args_schema", None))
+        for tool in tools
+        if hasattr(tool, 'name') and hasattr(tool, 'description')
+    )
+
+
+@lru_cache(maxsize=256)
+def _tool_parameters(schema: Any) -> Dict[str, Any]:
+    """JSON schema of a tool's arguments, built once per args_schema class."""
+    # pydantic v2; .schema() is the deprecated v1 spelling
+    if hasattr(schema, "model_json_schema"):
+        return schema.model_json_schema()
+    return schema.schema()
+
+
+@lru_cache(maxsize=64)
+def _openai_tools(tool_specs: Tuple[Tuple[str, str, Any], ...]) -> Tuple[List[Dict[str, Any]], Any]:
+    """Convert tools to OpenAI format, once per tool set.
+    
+    Returns the converted list and the form to put in the payload: a
+    pre-serialized JSON fragment with orjson >= 3.9, the list otherwise.
+    """
+    openai_tools = []
+    
+    for name, description, schema in tool_specs:
+        # Standard OpenAI format
+        openai_tool = {
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            }
+        }
+        
+        # Extract parameters from tool if available
+        if hasattr(schema, "model_json_schema") or hasattr(schema, "schema"):
+            openai_tool["function"]["parameters"] = _tool_parameters(schema)
+        
+        openai_tools.append(openai_tool)
+    
+    tools_body = _Fragment(_dumps(openai_tools)) if _Fragment is not None else openai_tools
+    return openai_tools, tools_body
+
+
+class _RetryBudget:
+    """Shared token bucket capping the number of retries per second.
+    
+    When many agents hit the same error at once, only the first retries
+    go through; the others fail fast instead of retrying in lockstep
+    (thundering herd).
+    """
+    
+    def __init__(self, capacity: float = 10, refill_per_second: float = 1):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> bool:
+        """Take a token if one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    """Delay requested by a Retry-After header (seconds or HTTP date), 0 otherwise."""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _BudgetedRetry(Retry):
+    """urllib3 retry policy drawing on the shared retry budget.
+    
+    The backoff is "full jitter", uniform in [0, backoff_factor * 2**n]
+    (urllib3's own does not wait before the first retry). A Retry-After
+    header from the server takes precedence.
+    """
+    
+    # Cap on the delay between two attempts, in seconds
+    MAX_BACKOFF = 60
+    
+    def parse_retry_after(self, retry_after: str) -> float:
+        # Lenient (fractional seconds, invalid values ignored) and capped
+        return min(self.MAX_BACKOFF, _parse_retry_after(retry_after))
+    
+    def get_backoff_time(self) -> float:
+        ceiling = self.backoff_factor * (2 ** max(0, len(self.history) - 1))
+        return random.uniform(0, min(self.MAX_BACKOFF, ceiling))
+    
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # Only the chat/completions POSTs are retried (the warm-up HEAD is best effort)
+        if method != "POST":
+            raise MaxRetryError(_pool, url, error or ResponseError("not retried"))
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if not _OpenAICompatibleLLM._retry_budget.acquire():
+            print("Retry budget exhausted, giving up")
+            raise MaxRetryError(_pool, url, error or ResponseError("retry budget exhausted"))
+        cause = f"Error {response.status}" if response is not None else f"Request failed: {error}"
+        print(f"{cause} - retry attempt {len(retry.history)}")
+        return retry
+
+
+class _OpenAICompatibleLLM(BaseLLM):
+    """CrewAI LLM calling an OpenAI-compatible chat/completions API directly."""
+    
+    # Name used in error messages
+    provider_name = "OpenAI-compatible"
+    
+    # Status codes worth a retry (443: connection timeout reported by some gateways)
+    retryable_status_codes = frozenset({408, 429, 443, 500, 502, 503, 504})
+    
+    # Retry budget shared by every instance, all providers included
+    _retry_budget = _RetryBudget()
+    
+    def __init__(
+        self,
+        model: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        temperature: Optional[float] = 0.1,
+        max_tokens: Optional[int] = None,
+        timeout: float = 30,
+        batch_window_ms: float = 0,
+        max_batch_size: int = 32,
+        bin_edges: Tuple[int, ...] = DEFAULT_BIN_EDGES,
+        stream: bool = False,
+        http2: bool = False,
+        compress_requests: bool = False
+    ):
+        super().__init__(
+            model=model,
+            temperature=temperature
+        )
+        
+        self.api_key = api_key
+        self.endpoint = base_url.rstrip('/')  # Remove trailing slash if present
+        self.timeout = timeout
+        self.max_retries = 3  # Maximum number of attempts
+        self.initial_delay = 1  # Initial delay in seconds
+        self.max_delay = 60  # Cap on the delay between two attempts
+        # Longest wait for a batched call: every attempt times out, longest backoff in between
+        self._batch_call_timeout = self.max_retries * (timeout + self.max_delay)
+        self.stream = stream  # Read responses incrementally as SSE
+        # Gzip large request bodies: opt-in, only for endpoints known to decode them
+        self.compress_requests = compress_requests
+        
+        # Persistent HTTP session: reuse TCP/TLS connections across calls
+        self._session = requests.Session()
+        # Retries (status codes and transport errors) are handled by urllib3
+        # on the pooled connection; the last response is returned as is
+        retry = _BudgetedRetry(
+            total=self.max_retries - 1,
+            backoff_factor=self.initial_delay,
+            status_forcelist=self.retryable_status_codes,
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._headers = {"Content-Type": "application/json"}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+        self._session.headers.update(self._headers)
+        # Invariant part of the request body, merged into every call
+        self._static_payload = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "stream": False
+        }
+        if max_tokens is not None:
+            self._static_payload["max_tokens"] = max_tokens
+        
+        # Optional coalescing of concurrent calls (batch_window_ms > 0). With
+        # http2=True and no window, each call is sent alone but every thread
+        # shares the batcher's httpx client, multiplexed over one HTTP/2 connection
+        self._batcher = None
+        self._batch_client = None
+        # httpx client of acall(), bound to the event loop that created it
+        self._aclient = None
+        self._aclient_loop = None
+        if batch_window_ms > 0 or http2:
+            if httpx is None:
+                raise ImportError("httpx is not installed. Install it with: pip install httpx")
+            self._batcher = _PromptBatcher(
+                _weak_dispatch(self), batch_window_ms, max_batch_size, bin_edges=bin_edges
+            )
+        
+        # Open the first connection (TCP + TLS) in the background, before the first call
+        threading.Thread(target=self._warmup, daemon=True).start()
+    
+    def _warmup(self):
+        """Establish a pooled connection to the endpoint; errors are ignored."""
+        try:
+            if self._batcher is not None:
+                self._batcher.run(self._awarmup(), timeout=10)
+            else:
+                self._session.head(self.endpoint, timeout=5).close()
+        except Exception as e:
+            logger.debug("Connection warm-up failed: %s", e)
+    
+    async def _awarmup(self):
+        if self._batch_client is None:
+            self._batch_client = self._async_client()
+        await self._batch_client.head(self.endpoint, timeout=5)
+    
+    def close(self):
+        """Close the HTTP session, the batcher thread and their pooled connections."""
+        self._session.close()
+        self._aclient = self._aclient_loop = None
+        if self._batcher is not None:
+            # The batcher's httpx client is closed on its own loop, before the loop stops
+            client = self._batch_client
+            self._batcher.close(client.aclose if client is not None else None)
+    
+    def __del__(self):
+        # getattr: __init__ may have failed before the session or batcher was created
+        # (CrewAI never calls close(): the batcher thread must not outlive the client)
+        session = getattr(self, "_session", None)
+        if session is not None:
+            session.close()
+        batcher = getattr(self, "_batcher", None)
+        if batcher is not None:
+            client = getattr(self, "_batch_client", None)
+            batcher.close(client.aclose if client is not None else None)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.initial_delay * (2 ** attempt)))
+        return min(self.max_delay, max(delay, _parse_retry_after(retry_after)))
+    
+    def _encode_body(self, payload: Dict[str, Any]) -> Tuple[bytes, Optional[Dict[str, str]]]:
+        """Serialize a payload, gzip-compressed if enabled, large and accepted by the endpoint.
+        
+        Returns the body and the extra headers to send with it.
+        """
+        body = _dumps(payload)
+        if self.compress_requests and len(body) > GZIP_MIN_BYTES and self.endpoint not in _gzip_refused:
+            return gzip.compress(body, compresslevel=1), {"Content-Encoding": "gzip"}
+        return body, None
+    
+    def _post(self, payload: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """POST a payload to chat/completions (retries are done by the session adapter)."""
+        body, headers = self._encode_body(payload)
+        response = self._session.post(
+            f"{self.endpoint}/chat/completions",
+            data=body,
+            headers=headers,
+            stream=stream,
+            timeout=self.timeout
+        )
+        
+        # Compressed bodies not supported: remember it and resend uncompressed
+        if headers and _gzip_refused_by(response):
+            logger.info("%s refused a gzip request body (%s), sending uncompressed", self.endpoint, response.status_code)
+            _gzip_refused.add(self.endpoint)
+            response.close()
+            return self._post(payload, stream)
+        
+        return response
+    
+    def _convert_tools_to_openai_format(self, tools: List[Any]) -> List[Dict[str, Any]]:
+        """Convert CrewAI tools to OpenAI format to prevent hallucinations."""
+        return _openai_tools(_tool_specs(tools))[0]
+    
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        **kwargs  # Accept any additional kwargs from CrewAI (like from_task, etc.)
+    ) -> Union[str, Any]:
+        """Call the API with the given messages.
+        
+        Returns:
+            - str: the text content when the LLM answers with text
+            - Any: the result of the tool execution when a tool call is detected
+            - Iterator[str]: with stream=True, the text deltas as they arrive
+              (tool calls are not executed in this mode)
+        """
+        payload = self._build_payload(messages, tools)
+        
+        if self._batcher is not None and not stream:
+            try:
+                result = self._batcher.submit(payload).result(self._batch_call_timeout)
+            except FutureTimeoutError:
+                raise TimeoutError(f"no reply from the batcher after {self._batch_call_timeout}s") from None
+            return self._parse_completion(result, available_functions)
+        
+        wire_stream = stream or self.stream
+        if wire_stream:
+            payload["stream"] = True
+        
+        # Make API call with retry
+        try:
+            response = self._post(payload, stream=wire_stream)
+            
+            if response.status_code >= 400:
+                # Report the size of the messages (context-length errors, 413...)
+                sent = payload["messages"]
+                total_size = sum(len(msg.get("content") or "") for msg in sent)
+                print(f"Error {response.status_code} - Message size: {total_size} characters")
+                print(f"Number of messages: {len(sent)}")
+                raise HTTPError(
+                    f"{response.status_code} Error: {response.reason} for url: {response.url}",
+                    response=response
+                )
+            
+            if stream:
+                return self._iter_content(response)
+            if self.stream:
+                return self._parse_completion(self._collect_stream(response), available_functions)
+            return self._parse_completion(_loads(response.content), available_functions)
+        
+        except RequestException as e:
+            print(f"Error calling {self.provider_name} API: {str(e)}")
+            if hasattr(e.response, 'text'):
+                print(f"Response text: {e.response.text}")
+            raise
+    
+    @staticmethod
+    def _iter_sse(response: requests.Response):
+        """Iterate over the JSON chunks of an SSE response (stream=True)."""
+        with response:
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                yield _loads(data)
+    
+    def _iter_content(self, response: requests.Response) -> Iterator[str]:
+        """Yield the text deltas of an SSE response as they arrive."""
+        for chunk in self._iter_sse(response):
+            if not chunk.get("choices"):
+                continue
+            content = (chunk["choices"][0].get("delta") or {}).get("content")
+            if content:
+                yield content
+    
+    def _collect_stream(self, response: requests.Response) -> Dict[str, Any]:
+        """Assemble an SSE response into the shape of a non-streamed one.
+        
+        Text and tool-call arguments arrive as deltas; tool-call deltas
+        carry the index of the call they extend.
+        """
+        content_parts = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        
+        # Each chunk is dropped as soon as its delta is merged
+        for chunk in self._iter_sse(response):
+            if not chunk.get("choices"):
+                continue
+            delta = chunk["choices"][0].get("delta") or {}
+            if delta.get("content"):
+                content_parts.append(delta["content"])
+            for call_delta in delta.get("tool_calls") or ():
+                call = tool_calls.setdefault(call_delta.get("index", 0), {
+                    "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+                })
+                if call_delta.get("id"):
+                    call["id"] = call_delta["id"]
+                function = call_delta.get("function") or {}
+                if function.get("name"):
+                    call["function"]["name"] = function["name"]
+                if function.get("arguments"):
+                    call["function"]["arguments"] += function["arguments"]
+        
+        message = {"role": "assistant", "content": "".join(content_parts)}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+        return {"choices": [{"message": message}]}
+    
+    def _build_payload(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the chat/completions request body."""
+        # Convert string to message format if needed
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        
+        # Prepare request
+        payload = {**self._static_payload, "messages": messages}
+        
+        # Add tools if provided and supported
+        if tools and self.supports_function_calling():
+            # Converted once per tool set (cached)
+            openai_tools, tools_body = _openai_tools(_tool_specs(tools))
+            if openai_tools:
+                payload["tools"] = tools_body
+                payload["tool_choice"] = "auto"
+        
+        return payload
+    
+    def _parse_completion(
+        self,
+        result: Dict[str, Any],
+        available_functions: Optional[Dict[str, Any]] = None
+    ) -> Union[str, Any]:
+        """Return the text of a completion, or run the tools it asks for."""
+        # Handle tool calls if present
+        message = result["choices"][0]["message"]
+        text_response = message.get("content", "")
+        
+        # Check for tool calls
+        tool_calls = message.get("tool_calls", [])
+        
+        # If no tool calls or no available functions, return the text response directly
+        if not tool_calls or not available_functions:
+            return text_response
+        
+        # Handle tool calls if present - EXECUTE THE FUNCTIONS
+        tool_result = self._handle_tool_call(tool_calls, available_functions)
+        if tool_result is not None:
+            return tool_result
+        
+        # If tool call handling didn't return a result, return text response
+        return text_response
+    
+    async def _amake_request_with_retry(self, client: "httpx.AsyncClient", url: str, payload: Dict[str, Any]) -> "httpx.Response":
+        """Make a request with httpx, retrying on temporary errors (non-blocking waits)."""
+        attempt = 0
+        last_exception = None
+        body, headers = self._encode_body(payload)
+        
+        while attempt < self.max_retries:
+            last_attempt = attempt == self.max_retries - 1
+            retry_after = None
+            try:
+                response = await client.post(url, content=body, headers=headers)
+                if headers and _gzip_refused_by(response):
+                    # Compressed bodies not supported: resend uncompressed (not an attempt)
+                    logger.info("%s refused a gzip request body (%s), sending uncompressed", self.endpoint, response.status_code)
+                    _gzip_refused.add(self.endpoint)
+                    body, headers = self._encode_body(payload)
+                    continue
+                if 200 <= response.status_code < 300 or response.status_code not in self.retryable_status_codes:
+                    return response
+                print(f"Error {response.status_code} (async)")
+                if last_attempt or not self._retry_budget.acquire():
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError as e:
+                last_exception = e
+                print(f"Request failed: {str(e)}")
+                if last_attempt:
+                    break
+                if not self._retry_budget.acquire():
+                    raise
+            
+            delay = self._retry_delay(attempt, retry_after)
+            print(f"Retry attempt {attempt + 1}/{self.max_retries} after {delay:.2f} seconds...")
+            await asyncio.sleep(delay)
+            attempt += 1
+        
+        # All attempts failed
+        if last_exception:
+            raise last_exception
+        raise Exception("All retry attempts failed")
+    
+    def _async_client(self) -> "httpx.AsyncClient":
+        """httpx client for concurrent calls, with the same headers and timeout."""
+        return httpx.AsyncClient(
+            http2=_HTTP2,
+            headers=self._headers,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=self.timeout
+        )
+    
+    async def _dispatch_batch(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        """Send a batch of coalesced requests (runs on the batcher loop)."""
+        if self._batch_client is None:
+            self._batch_client = self._async_client()
+        url = f"{self.endpoint}/chat/completions"
+        
+        # chat/completions takes one prompt per request: fan the batch out on one client
+        async def _one(payload):
+            response = await self._amake_request_with_retry(self._batch_client, url, payload)
+            response.raise_for_status()
+            return _loads(response.content)
+        
+        return await asyncio.gather(*(_one(payload) for payload in payloads), return_exceptions=True)
+    
+    async def acall(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Union[str, Any]:
+        """Async variant of call(): retry waits do not hold a worker thread.
+        
+        Calls made from the same event loop share one httpx client (HTTP/2
+        when available).
+        """
+        if httpx is None:
+            raise ImportError("httpx is not installed. Install it with: pip install httpx")
+        
+        # An AsyncClient stays bound to the loop that opened it
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = self._async_client()
+            self._aclient_loop = loop
+        
+        response = await self._amake_request_with_retry(
+            self._aclient, f"{self.endpoint}/chat/completions", self._build_payload(messages, tools)
+        )
+        response.raise_for_status()
+        return self._parse_completion(_loads(response.content), available_functions)
+    
+    async def acall_batch(
+        self,
+        messages_list: List[Union[str, List[Dict[str, str]]]],
+        tools: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        concurrency: int = 16
+    ) -> List[Union[str, Any]]:
+        """Send several independent prompts concurrently.
+        
+        Requests share one httpx client (HTTP/2 when available), with at
+        most `concurrency` of them in flight at once.
+        
+        Returns:
+            The responses, in the order of messages_list
+        """
+        if httpx is None:
+            raise ImportError("httpx is not installed. Install it with: pip install httpx")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        url = f"{self.endpoint}/chat/completions"
+        
+        # One client per call: an AsyncClient stays bound to the loop that opened it
+        async with self._async_client() as client:
+            async def _one(messages):
+                async with semaphore:
+                    response = await self._amake_request_with_retry(
+                        client, url, self._build_payload(messages, tools)
+                    )
+                response.raise_for_status()
+                return self._parse_completion(_loads(response.content), available_functions)
+            
+            return await asyncio.gather(*(_one(messages) for messages in messages_list))
+    
+    def _handle_tool_call(
+        self,
+        tool_calls: List[Any],
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Any]:
+        """Handle the tool calls from the LLM.
+        
+        All the calls of one response are executed concurrently, in a thread
+        pool (coroutine tools run on their own event loop in their thread).
+        
+        Args:
+            tool_calls: List of tool calls from the LLM
+            available_functions: Dict of available functions
+        
+        Returns:
+            Optional[Any]: The result of the tool call when there is one; with
+            several, a dict mapping each tool_call id to its result. None if
+            no tool call could be executed.
+        """
+        # Validate tool calls and available functions
+        if not tool_calls or not available_functions:
+            return None
+        
+        # Keep only the calls to available functions, with their parsed arguments
+        calls = []
+        for index, tool_call in enumerate(tool_calls):
+            function_name = tool_call["function"]["name"]
+            if function_name not in available_functions:
+                continue
+            try:
+                function_args = _loads(tool_call["function"]["arguments"])
+            except Exception as e:
+                print(f"Error executing function '{function_name}': {e}")
+                continue
+            call_id = tool_call.get("id") or str(index)
+            calls.append((call_id, function_name, available_functions[function_name], function_args))
+        
+        if not calls:
+            return None
+        
+        # A single synchronous call runs inline, without a pool
+        if len(calls) == 1 and not inspect.iscoroutinefunction(calls[0][2]):
+            call_id, function_name, fn, function_args = calls[0]
+            return self._run_tool(function_name, fn, function_args)
+        
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [
+                (call_id, executor.submit(self._run_tool, function_name, fn, function_args))
+                for call_id, function_name, fn, function_args in calls
+            ]
+            results = {call_id: future.result() for call_id, future in futures}
+        
+        # Failed calls are left out
+        results = {call_id: result for call_id, result in results.items() if result is not None}
+        if not results:
+            return None
+        if len(calls) == 1:
+            return next(iter(results.values()))
+        return results
+    
+    @staticmethod
+    def _run_tool(function_name: str, fn: Any, function_args: Dict[str, Any]) -> Optional[Any]:
+        """Execute one tool; errors are reported and give None."""
+        try:
+            result = fn(**function_args)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            
+            logger.debug("Tool call executed: %s with args %s", function_name, function_args)
+            return result
+        except Exception as e:
+            print(f"Error executing function '{function_name}': {e}")
+            return None
+    
+    def supports_function_calling(self) -> bool:
+        """Indicate if the model supports function calling."""
+        return True
+    
+    def get_context_window_size(self) -> int:
+        """Return the context window size of the model."""
+        return 8192
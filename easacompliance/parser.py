@@ -13,11 +13,20 @@ Avantages:
 Basé sur le schéma EASA eRules XML Export Schema 1.0.0
 """
 
-import xml.etree.ElementTree as ET
+# lxml (optionnel) : parsing en C (libxml2), plus rapide et plus sobre en mémoire
+try:
+    from lxml import etree as ET
+    _LXML = True
+except ImportError:
+    # ElementTree de la stdlib : utilise déjà l'accélérateur C (_elementtree),
+    # l'ancien alias cElementTree n'existe plus depuis Python 3.9
+    import xml.etree.ElementTree as ET
+    _LXML = False
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Mapping, Tuple
 from enum import Enum
 from pathlib import Path
+from collections import Counter
 import re
 from tqdm import tqdm
 
@@ -35,18 +44,20 @@ class TopicType(Enum):
     @classmethod
     def from_string(cls, value: str) -> 'TopicType':
         """Convertir une chaîne en TopicType"""
-        for topic_type in cls:
-            if topic_type.value == value:
-                return topic_type
-        return cls.OTHER
+        return _TOPIC_TYPE_BY_VALUE.get(value, cls.OTHER)
 
 
-@dataclass
+# Index valeur -> TopicType (lookup O(1) dans from_string)
+_TOPIC_TYPE_BY_VALUE = {topic_type.value: topic_type for topic_type in TopicType}
+
+
+@dataclass(slots=True)
 class Topic:
     """
     Représente un topic EASA (paragraphe réglementaire) avec ses métadonnées.
     
     Correspond à un élément <topic> dans la structure XML EASA.
+    __slots__ (pas de __dict__) : instances plus légères quand tout le corpus est chargé.
     """
     # Identification
     reference: str  # Ex: "ORO.FTL.110"
@@ -89,14 +100,12 @@ class Topic:
             parts.append(self.content)
         
         # Contexte réglementaire (pour améliorer les embeddings)
-        context_parts = []
-        if self.regulatory_subject:
-            context_parts.append(f"Subject: {self.regulatory_subject}")
-        if self.domain:
-            context_parts.append(f"Domain: {self.domain}")
-        
-        if context_parts:
-            parts.append(" | ".join(context_parts))
+        if self.regulatory_subject and self.domain:
+            parts.append(f"Subject: {self.regulatory_subject} | Domain: {self.domain}")
+        elif self.regulatory_subject:
+            parts.append(f"Subject: {self.regulatory_subject}")
+        elif self.domain:
+            parts.append(f"Domain: {self.domain}")
         
         return "\n\n".join(parts)
     
@@ -153,94 +162,170 @@ class EASAParser:
     # Accepte espace, point ou tiret comme séparateur
     REF_PATTERN = re.compile(r'^([A-Z]{2,4}[\.\-\s][A-Z]{2,4}\.[0-9]+(?:\.[0-9]+)?)')
     
-    def __init__(self, xml_path: str):
+    # Pattern unique pour tous les formats de source-title, compilé une seule fois.
+    # Les alternatives sont essayées dans l'ordre : la première qui correspond l'emporte.
+    SOURCE_TITLE_PATTERN = re.compile(
+        r'^(?:'
+        r'(?P<amc_gm>(?:AMC|GM)\d+)\s+'  # Cas 1 : AMC1 ou GM1 etc.
+        r'(?P<amc_gm_ref>[A-Z]{2,4}[\.\-\s][A-Z]{2,4}\.[0-9]+(?:\.[0-9]+)?(?:\([a-z0-9;]+\))?)'  # suivi d'une référence avec possibilité de (a), (1), etc.
+        r'|(?P<ref>[A-Z]{2,4}[\.\-\s][A-Z]{2,4}\.[0-9]+(?:\.[0-9]+)?)'  # Cas 2 : même motif que REF_PATTERN
+        r'|(?P<amc_gm_article>(?:AMC|GM)\d+\s+Article\s+[\d\w\(\)\.\;]+)'  # Cas 3 : AMC1 Article 2(1)(d)
+        r'|(?P<article>Article\s+[\d\w\.]+)'  # Cas 4 : Article 2
+        r')'
+    )
+    
+    def __init__(self, xml_path: str, preload_content: bool = True):
         """
         Initialise le parser.
         
         Args:
             xml_path: Chemin vers le fichier XML EASA
+            preload_content: Indexer les contenus SDT dès l'initialisation. Si False,
+                l'indexation est faite au premier accès à un contenu (inutile pour
+                les statistiques ou la seule structure de la TOC).
         """
         self.xml_path = Path(xml_path)
         if not self.xml_path.exists():
             raise FileNotFoundError(f"File not found: {xml_path}")
         
-        print(f"📖 Chargement du document XML...")
-        self.tree = ET.parse(str(self.xml_path))
-        self.root = self.tree.getroot()
-        
         # Caches pour performances
         self._toc_element = None
-        self._document_element = None
         self._document_element_easa = None
         self._sdt_content_index: Dict[str, str] = {}  # sdt_id -> contenu texte
+        self._sdt_indexed = False  # index des contenus construit (à l'init ou à la demande)
+        self._ref_title_cache: Dict[str, tuple[str, str]] = {}  # source-title -> (référence, titre)
+        self._ref_to_element: Dict[str, ET.Element] = {}  # référence -> élément <topic>
+        self._topic_elements: List[ET.Element] = []  # éléments <topic> de la TOC, dans l'ordre du document
+        
+        # Lecture en flux : TOC conservée, contenus SDT indexés au passage (si demandé),
+        # corps du document Word libéré au fur et à mesure
+        if preload_content:
+            print(f"📖 Lecture du document XML et indexation des contenus SDT...")
+        else:
+            print(f"📖 Lecture du document XML (contenus SDT indexés à la demande)...")
+        self._extract_main_elements(index_content=preload_content)
+        self._sdt_indexed = preload_content
+        
+        # Liste des topics et index par référence (lookups O(1) dans get_topic_by_reference)
+        self._build_reference_index()
+        
+        if preload_content:
+            print(f"✅ Parser initialisé (structure EASA v2) - {len(self._sdt_content_index)} contenus indexés")
+        else:
+            print(f"✅ Parser initialisé (structure EASA v2) - {len(self._topic_elements)} topics")
+    
+    def _iterparse(self, tags: tuple):
+        """
+        Événements (start, end) du parsing en flux du fichier XML.
         
-        # Extraire et cacher les éléments principaux
-        self._extract_main_elements()
+        Avec lxml, seuls les éléments de `tags` produisent des événements ;
+        avec ElementTree, tous les éléments en produisent (à filtrer).
+        """
+        if _LXML:
+            # huge_tree : le document Word dépasse les limites par défaut de libxml2
+            return ET.iterparse(
+                str(self.xml_path), events=('start', 'end'), tag=tags,
+                huge_tree=True, collect_ids=False, remove_comments=True, remove_pis=True
+            )
+        return ET.iterparse(str(self.xml_path), events=('start', 'end'))
+    
+    @staticmethod
+    def _release(element):
+        """Libère un élément déjà traité (et, avec lxml, ses frères précédents)."""
+        element.clear()
+        if _LXML:
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+    
+    def _extract_main_elements(self, extract_toc: bool = True, index_content: bool = True):
+        """
+        Extrait la TOC EASA et indexe les SDT en une seule lecture en flux.
         
-        # Indexer tous les SDT en une seule passe (optimisation cruciale)
-        print(f"🔍 Indexation des contenus SDT...")
-        self._build_sdt_index()
+        Seule la partie contenant la TOC est gardée en mémoire ; le document
+        Word (l'essentiel du fichier) n'est jamais chargé en entier.
         
-        print(f"✅ Parser initialisé (structure EASA v2) - {len(self._sdt_content_index)} contenus indexés")
-    
-    def _extract_main_elements(self):
-        """Extrait et cache les éléments principaux du XML"""
-        for part in self.root.findall(f'{self.NS_PKG}part'):
-            name = part.get(f'{self.NS_PKG}name', '')
-            xmldata = part.find(f'{self.NS_PKG}xmlData')
-            
-            if xmldata is None:
-                continue
+        Args:
+            extract_toc: Rechercher et conserver la TOC EASA
+            index_content: Indexer le contenu texte des SDT (sinon ils sont
+                seulement libérés au passage)
+        """
+        part_tag = f'{self.NS_PKG}part'
+        sdt_tag = f'{self.NS_W}sdt'
+        name = ''
+        in_word_document = False
+        sdt_depth = 0  # SDT ouverts (imbriqués) à la position courante
+        content_pool: Dict[str, str] = {}  # textes déjà indexés : une seule copie par texte identique
+        
+        for event, element in self._iterparse((part_tag, sdt_tag)):
+            tag = element.tag
             
-            # TOC (Table of Contents) - Structure EASA
-            # Chercher dans tous les customXml/itemN.xml (le numéro varie selon le document)
-            if '/customXml/item' in name and name.endswith('.xml'):
-                doc = xmldata.find(f'{self.NS_ER}document')
-                if doc is not None:
-                    toc = doc.find(f'{self.NS_ER}toc')
-                    if toc is not None:
-                        self._toc_element = toc
-                        self._document_element_easa = doc  # Garder aussi le document EASA
-                        print(f"   📄 Document EASA trouvé dans: {name}")
+            if tag == sdt_tag and in_word_document:
+                if event == 'start':
+                    sdt_depth += 1
+                    continue
+                sdt_depth -= 1
+                if index_content:
+                    self._index_sdt(element, content_pool)
+                # Un SDT imbriqué fait encore partie du texte de son parent
+                if sdt_depth == 0:
+                    self._release(element)
             
-            # Document principal Word
-            elif '/word/document.xml' in name:
-                self._document_element = xmldata
+            elif tag == part_tag:
+                if event == 'start':
+                    name = element.get(f'{self.NS_PKG}name', '')
+                    in_word_document = '/word/document.xml' in name
+                    continue
+                in_word_document = False
+                
+                # TOC (Table of Contents) - Structure EASA
+                # Chercher dans tous les customXml/itemN.xml (le numéro varie selon le document)
+                xmldata = element.find(f'{self.NS_PKG}xmlData')
+                if extract_toc and xmldata is not None and '/customXml/item' in name and name.endswith('.xml'):
+                    doc = xmldata.find(f'{self.NS_ER}document')
+                    if doc is not None:
+                        toc = doc.find(f'{self.NS_ER}toc')
+                        if toc is not None:
+                            self._toc_element = toc
+                            self._document_element_easa = doc  # Garder aussi le document EASA
+                            print(f"   📄 Document EASA trouvé dans: {name}")
+                            continue
+                
+                # Partie inutile (ou déjà indexée) : libérée
+                element.clear()
     
-    def _build_sdt_index(self):
+    def _build_reference_index(self):
         """
-        Construit un index de tous les SDT en une seule passe.
-        
-        Ceci est une optimisation cruciale : au lieu de faire 3357 recherches récursives
-        (une par topic), on fait UNE seule passe pour indexer tous les SDT.
-        
-        Complexité : O(n) au lieu de O(n²)
+        Cache la liste des éléments <topic> de la TOC (un seul parcours de l'arbre)
+        et les indexe par référence (première occurrence retenue).
         """
-        if self._document_element is None:
+        if self._toc_element is None:
             return
         
-        def index_sdts_recursive(element):
-            """Parcours récursif pour indexer tous les SDT"""
-            for child in element:
-                tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                
-                if tag == 'sdt':
-                    # Extraire l'ID
-                    sdtpr = child.find(f'{self.NS_W}sdtPr')
-                    if sdtpr is not None:
-                        id_elem = sdtpr.find(f'{self.NS_W}id')
-                        if id_elem is not None:
-                            sdt_id = id_elem.get(f'{self.NS_W}val', '')
-                            if sdt_id:
-                                # Extraire et indexer le contenu
-                                content = self._extract_text_from_sdt(child)
-                                if content:
-                                    self._sdt_content_index[sdt_id] = content
-                
-                # Récursion
-                index_sdts_recursive(child)
+        self._topic_elements = list(self._toc_element.iter(f'{self.NS_ER}topic'))
+        for element in self._topic_elements:
+            ref, _ = self._extract_reference_and_title(element.get('source-title', ''))
+            self._ref_to_element.setdefault(ref, element)
+    
+    def _index_sdt(self, sdt, content_pool: Dict[str, str]):
+        """
+        Indexe le contenu texte d'un élément <w:sdt> par son identifiant.
         
-        index_sdts_recursive(self._document_element)
+        Les textes identiques (SDT différents, même contenu) partagent une seule
+        chaîne via `content_pool`, propre à la passe d'indexation.
+        """
+        # Extraire l'ID
+        sdtpr = sdt.find(f'{self.NS_W}sdtPr')
+        if sdtpr is not None:
+            id_elem = sdtpr.find(f'{self.NS_W}id')
+            if id_elem is not None:
+                sdt_id = id_elem.get(f'{self.NS_W}val', '')
+                if sdt_id:
+                    # Extraire et indexer le contenu
+                    content = self._extract_text_from_sdt(sdt)
+                    if content:
+                        self._sdt_content_index[sdt_id] = content_pool.setdefault(content, content)
     
     def _extract_reference_and_title(self, source_title: str) -> tuple[str, str]:
         """
@@ -258,50 +343,37 @@ class EASAParser:
         Returns:
             (reference, title) tuple
         """
+        # Mémoïsation : chaque source-title est analysé une seule fois
+        cached = self._ref_title_cache.get(source_title)
+        if cached is None:
+            cached = self._ref_title_cache[source_title] = self._parse_reference_and_title(source_title)
+        return cached
+    
+    def _parse_reference_and_title(self, source_title: str) -> tuple[str, str]:
+        """Analyse (non mémoïsée) d'un source-title, voir `_extract_reference_and_title`."""
         if not source_title:
             return "", ""
         
-        # Cas 1: Format AMC/GM (ex: "AMC1 ORO.FTL.110 Title")
-        # Pattern: AMC[numéro] ou GM[numéro] suivi d'une référence
-        amc_gm_pattern = re.compile(
-            r'^((?:AMC|GM)\d+)\s+'  # AMC1 ou GM1 etc.
-            r'([A-Z]{2,4}[\.\-\s][A-Z]{2,4}\.[0-9]+(?:\.[0-9]+)?(?:\([a-z0-9;]+\))?)'  # Référence avec possibilité de (a), (1), etc.
-        )
-        match = amc_gm_pattern.match(source_title)
-        if match:
-            prefix = match.group(1)  # AMC1, GM1, etc.
-            ref = match.group(2)  # ORO.FTL.110(a)
-            # La référence complète inclut le préfixe
-            full_ref = f"{prefix} {ref}"
-            title = source_title[len(full_ref):].strip()
-            return full_ref, title
-        
-        # Cas 2: Format standard IR (ex: "ORO.FTL.110 Title")
-        match = self.REF_PATTERN.match(source_title)
-        if match:
-            ref = match.group(1)
-            title = source_title[len(ref):].strip()
-            return ref, title
-        
-        # Cas 3: Format Article (ex: "AMC1 Article 2(1)(d) Definitions")
-        # On garde le préfixe AMC/GM + Article comme référence
-        article_pattern = re.compile(
-            r'^((?:AMC|GM)\d+\s+Article\s+[\d\w\(\)\.\;]+)'  # AMC1 Article 2(1)(d)
-        )
-        match = article_pattern.match(source_title)
+        match = self.SOURCE_TITLE_PATTERN.match(source_title)
         if match:
-            ref = match.group(1)
-            title = source_title[len(ref):].strip()
-            return ref, title
-        
-        # Cas 4: Article sans préfixe (ex: "Article 2 - Definitions")
-        article_simple_pattern = re.compile(r'^(Article\s+[\d\w\.]+)')
-        match = article_simple_pattern.match(source_title)
-        if match:
-            ref = match.group(1)
+            kind = match.lastgroup
+            
+            # Cas 1: Format AMC/GM (ex: "AMC1 ORO.FTL.110 Title")
+            if kind == 'amc_gm_ref':
+                # La référence complète inclut le préfixe (AMC1, GM1, etc.)
+                full_ref = f"{match.group('amc_gm')} {match.group('amc_gm_ref')}"
+                title = source_title[len(full_ref):].strip()
+                return full_ref, title
+            
+            # Cas 2: Format standard IR (ex: "ORO.FTL.110 Title")
+            # Cas 3: Format Article (ex: "AMC1 Article 2(1)(d) Definitions"),
+            #        on garde le préfixe AMC/GM + Article comme référence
+            # Cas 4: Article sans préfixe (ex: "Article 2 - Definitions")
+            ref = match.group(kind)
             title = source_title[len(ref):].strip()
-            # Retirer le tiret initial du titre si présent
-            title = title.lstrip('- ')
+            if kind == 'article':
+                # Retirer le tiret initial du titre si présent
+                title = title.lstrip('- ')
             return ref, title
         
         # Cas 5: Aucun pattern ne correspond
@@ -312,6 +384,8 @@ class EASAParser:
         Trouve et extrait le contenu d'un SDT (Structured Document Tag) par son ID.
         
         OPTIMISÉ : Lookup O(1) dans l'index pré-construit au lieu de recherche récursive.
+        L'index est construit au premier appel si le parser a été créé avec
+        preload_content=False.
         
         Args:
             sdt_id: L'identifiant du SDT
@@ -319,8 +393,17 @@ class EASAParser:
         Returns:
             Le texte complet du SDT
         """
+        if not self._sdt_indexed:
+            self._build_sdt_index()
         return self._sdt_content_index.get(sdt_id, "")
     
+    def _build_sdt_index(self):
+        """Indexe les contenus SDT (seconde lecture en flux, TOC déjà extraite)."""
+        print(f"🔍 Indexation des contenus SDT...")
+        self._extract_main_elements(extract_toc=False)
+        self._sdt_indexed = True
+        print(f"   ✅ {len(self._sdt_content_index)} contenus indexés")
+    
     def _extract_text_from_sdt(self, sdt_element: ET.Element) -> str:
         """
         Extrait le texte d'un élément SDT.
@@ -335,13 +418,13 @@ class EASAParser:
         if sdtcontent is None:
             return ""
         
-        # Extraire tout le texte des paragraphes
+        # Extraire tout le texte des paragraphes (iter : parcours en C, sans XPath)
+        t_tag = f'{self.NS_W}t'
         paragraphs = []
-        for p in sdtcontent.findall(f'.//{self.NS_W}p'):
-            texts = p.findall(f'.//{self.NS_W}t')
-            para_text = ''.join([t.text or '' for t in texts])
-            if para_text.strip():
-                paragraphs.append(para_text.strip())
+        for p in sdtcontent.iter(f'{self.NS_W}p'):
+            para_text = ''.join(t.text or '' for t in p.iter(t_tag)).strip()
+            if para_text:
+                paragraphs.append(para_text)
         
         return "\n".join(paragraphs)
     
@@ -352,31 +435,46 @@ class EASAParser:
         Args:
             topic_element: L'élément XML <topic>
         
+        Returns:
+            Un objet Topic
+        """
+        return self._build_topic_from_attrs(topic_element.attrib)
+    
+    def _build_topic_from_attrs(self, attrib: Mapping[str, str]) -> Topic:
+        """
+        Construit un Topic à partir des attributs d'un élément <topic>.
+        
+        Ne touche pas à l'arbre XML : seulement le titre (regex mémoïsées)
+        et l'index des contenus SDT.
+        
+        Args:
+            attrib: Les attributs de l'élément <topic>
+        
         Returns:
             Un objet Topic
         """
         # Extraire les attributs
-        source_title = topic_element.get('source-title', '')
+        source_title = attrib.get('source-title', '')
         reference, title = self._extract_reference_and_title(source_title)
         
-        erules_id = topic_element.get('ERulesId', '')
-        sdt_id = topic_element.get('sdt-id', '')
+        erules_id = attrib.get('ERulesId', '')
+        sdt_id = attrib.get('sdt-id', '')
         
         # Type de contenu
-        topic_type_str = topic_element.get('TypeOfContent', '')
+        topic_type_str = attrib.get('TypeOfContent', '')
         topic_type = TopicType.from_string(topic_type_str)
         
         # Métadonnées
-        domain = topic_element.get('Domain', '')
-        regulatory_subject = topic_element.get('RegulatorySubject', '')
-        regulatory_source = topic_element.get('RegulatorySource', '')
+        domain = attrib.get('Domain', '')
+        regulatory_subject = attrib.get('RegulatorySubject', '')
+        regulatory_source = attrib.get('RegulatorySource', '')
         
-        applicability_date = topic_element.get('ApplicabilityDate', '')
-        entry_into_force_date = topic_element.get('EntryIntoForceDate', '')
-        amended_by = topic_element.get('AmendedBy', '')
+        applicability_date = attrib.get('ApplicabilityDate', '')
+        entry_into_force_date = attrib.get('EntryIntoForceDate', '')
+        amended_by = attrib.get('AmendedBy', '')
         
-        icao_reference = topic_element.get('ICAOReference', '')
-        keywords = topic_element.get('Keywords', '')
+        icao_reference = attrib.get('ICAOReference', '')
+        keywords = attrib.get('Keywords', '')
         
         # Extraire le contenu via sdt-id
         content = ""
@@ -417,50 +515,23 @@ class EASAParser:
         Returns:
             Liste de topics
         """
-        if self._toc_element is None:
-            return []
-        
         topics = []
         regex_pattern = re.compile(pattern) if pattern else None
         
-        # Compter d'abord le nombre total d'éléments pour la barre de progression
-        def count_elements(element):
-            count = 1
-            for child in element:
-                count += count_elements(child)
-            return count
-        
-        total_elements = count_elements(self._toc_element) if show_progress else 0
-        pbar = tqdm(total=total_elements, desc="Extraction des topics", disable=not show_progress)
-        
-        def collect_topics(element):
-            """Collecte récursive des topics"""
-            if show_progress:
-                pbar.update(1)
-            
-            tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-            
-            if tag == 'topic':
-                topic = self._parse_topic_element(element)
-                
-                # Appliquer les filtres
-                if regex_pattern and not regex_pattern.match(topic.reference):
-                    pass  # Skip
-                elif topic_type_filter and topic.topic_type not in topic_type_filter:
-                    pass  # Skip
-                elif regulatory_subject_filter and regulatory_subject_filter not in topic.regulatory_subject:
-                    pass  # Skip
-                else:
-                    topics.append(topic)
-            
-            # Récursion
-            for child in element:
-                collect_topics(child)
-        
-        collect_topics(self._toc_element)
-        
-        if show_progress:
-            pbar.close()
+        # Liste des topics mise en cache à l'initialisation : pas de parcours de la TOC
+        for element in tqdm(self._topic_elements, desc="Extraction des topics", disable=not show_progress):
+            # Appliquer les filtres sur les attributs bruts, du moins coûteux au plus coûteux,
+            # avant de construire le Topic (et d'aller chercher son contenu)
+            attrib = element.attrib
+            if regulatory_subject_filter and regulatory_subject_filter not in attrib.get('RegulatorySubject', ''):
+                continue
+            if topic_type_filter and TopicType.from_string(attrib.get('TypeOfContent', '')) not in topic_type_filter:
+                continue
+            if regex_pattern:
+                reference, _ = self._extract_reference_and_title(attrib.get('source-title', ''))
+                if not regex_pattern.match(reference):
+                    continue
+            topics.append(self._build_topic_from_attrs(attrib))
         
         return topics
     
@@ -474,27 +545,7 @@ class EASAParser:
         Returns:
             Le topic ou None si non trouvé
         """
-        if self._toc_element is None:
-            return None
-        
-        def find_topic(element) -> Optional[ET.Element]:
-            """Recherche récursive du topic"""
-            tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-            
-            if tag == 'topic':
-                source_title = element.get('source-title', '')
-                ref, _ = self._extract_reference_and_title(source_title)
-                if ref == reference:
-                    return element
-            
-            for child in element:
-                result = find_topic(child)
-                if result is not None:
-                    return result
-            
-            return None
-        
-        topic_element = find_topic(self._toc_element)
+        topic_element = self._ref_to_element.get(reference)
         if topic_element is not None:
             return self._parse_topic_element(topic_element)
         
@@ -507,36 +558,45 @@ class EASAParser:
         Returns:
             Dictionnaire avec les statistiques
         """
-        all_topics = self.get_all_topics()
-        
-        # Compter par type
-        type_counts = {}
-        for topic in all_topics:
-            type_key = topic.topic_type.value
-            type_counts[type_key] = type_counts.get(type_key, 0) + 1
-        
-        # Compter par sujet réglementaire
-        subject_counts = {}
-        for topic in all_topics:
-            subject = topic.regulatory_subject or "Unknown"
-            subject_counts[subject] = subject_counts.get(subject, 0) + 1
-        
-        # Compter par catégorie (première partie de la référence)
-        category_counts = {}
-        for topic in all_topics:
-            if topic.reference:
+        # Une seule passe sur les attributs de la TOC, sans extraction du contenu
+        total_topics = 0
+        type_counts = Counter()
+        subject_counts = Counter()
+        category_counts = Counter()
+        for topic_type_str, regulatory_subject, reference in self._iter_topic_attrs():
+            total_topics += 1
+            
+            # Compter par type
+            type_counts[TopicType.from_string(topic_type_str).value] += 1
+            
+            # Compter par sujet réglementaire
+            subject_counts[regulatory_subject or "Unknown"] += 1
+            
+            # Compter par catégorie (première partie de la référence)
+            if reference:
                 # Extraire catégorie (ex: "ORO.FTL" de "ORO.FTL.110")
-                parts = topic.reference.split('.')
+                parts = reference.split('.', 2)  # seuls les deux premiers segments servent
                 if len(parts) >= 2:
-                    category = f"{parts[0]}.{parts[1]}"
-                    category_counts[category] = category_counts.get(category, 0) + 1
+                    category_counts[f"{parts[0]}.{parts[1]}"] += 1
         
         return {
-            "total_topics": len(all_topics),
-            "by_type": type_counts,
-            "by_subject": subject_counts,
-            "by_category": dict(sorted(category_counts.items(), key=lambda x: -x[1])[:20]),
+            "total_topics": total_topics,
+            "by_type": dict(type_counts),
+            "by_subject": dict(subject_counts),
+            "by_category": dict(category_counts.most_common(20)),
         }
+    
+    def _iter_topic_attrs(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Parcourt les topics en ne lisant que les attributs utiles aux statistiques.
+        
+        Yields:
+            (TypeOfContent, RegulatorySubject, référence) pour chaque topic
+        """
+        for element in self._topic_elements:
+            attrib = element.attrib
+            reference, _ = self._extract_reference_and_title(attrib.get('source-title', ''))
+            yield attrib.get('TypeOfContent', ''), attrib.get('RegulatorySubject', ''), reference
 
 
 if __name__ == "__main__":
@@ -17,6 +17,7 @@ class ServerConfig:
     
     # Modèle d'embeddings
     model_name: str = "all-MiniLM-L6-v2"
+    encode_backend: str = "torch"  # 'onnx' pour ONNX Runtime (int8) sur CPU
     
     # Limites
     max_search_results: int = 20
@@ -36,6 +37,7 @@ class ServerConfig:
             db_path=os.getenv("EASA_DB_PATH", "easa_complete.db"),
             xml_path=os.getenv("EASA_XML_PATH"),
             model_name=os.getenv("EASA_MODEL", "all-MiniLM-L6-v2"),
+            encode_backend=os.getenv("EASA_ENCODE_BACKEND", "torch"),
             max_search_results=int(os.getenv("EASA_MAX_RESULTS", "20")),
             enable_cache=os.getenv("EASA_CACHE", "true").lower() == "true",
         )
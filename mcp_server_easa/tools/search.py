@@ -42,7 +42,9 @@ class SearchTools:
         if self._embeddings_manager is None:
             self._embeddings_manager = EmbeddingsManager(
                 db_path=self.config.db_path,
-                model_name=self.config.model_name
+                model_name=self.config.model_name,
+                encode_backend=self.config.encode_backend,
+                query_cache_ttl=self.config.cache_ttl if self.config.enable_cache else 0
             )
         return self._embeddings_manager
     
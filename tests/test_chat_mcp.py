@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the request/response loop of chat_mcp.py.
+
+The OpenAI client and the MCP client are replaced by fakes; the real
+UnifiedLLMClient.chat_completion still decides the request options.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("mcp")
+
+import chat_mcp
+from chat_mcp import ChatMCPApp, ProviderConfig
+
+TOOLS = ({"type": "function", "function": {"name": "search", "parameters": {"type": "object"}}},)
+ANSWER = ["ORO.FTL.235 ", "limits rest."]
+
+
+def _tool_call_response(stream: bool, count: int = 1):
+    """First LLM turn: `count` calls to the search tool."""
+    tool_calls = [
+        SimpleNamespace(
+            index=i, id=f"c{i}", function=SimpleNamespace(name="search", arguments=f'{{"query": "rest {i}"}}')
+        )
+        for i in range(count)
+    ]
+    if not stream:
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=tool_calls))])
+    
+    async def chunks():
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None, tool_calls=tool_calls))])
+    return chunks()
+
+
+def _answer_response(stream: bool):
+    """Final LLM turn: the text answer."""
+    if not stream:
+        message = SimpleNamespace(content="".join(ANSWER), tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    async def chunks():
+        for text in ANSWER:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text, tool_calls=None))])
+    return chunks()
+
+
+class FakeCompletions:
+    """chat.completions stub: tool calls while tools may be used, then the answer."""
+    
+    def __init__(self, tool_calls: int = 1):
+        self.tool_calls = tool_calls
+        self.requests = []
+    
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if kwargs.get("tools") and kwargs.get("tool_choice") != "none":
+            return _tool_call_response(kwargs["stream"], self.tool_calls)
+        return _answer_response(kwargs["stream"])
+
+
+class FakeMCPClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+    
+    def get_tools_for_llm(self):
+        return TOOLS
+    
+    async def call_tool(self, tool_name, arguments):
+        self.calls.append((tool_name, arguments))
+        await asyncio.sleep(self.delay)
+        return "ORO.FTL.235 Rest periods"
+
+
+class FakeConfigManager:
+    def __init__(self, config: ProviderConfig):
+        self.config = config
+    
+    def get_provider(self, provider_id):
+        return self.config
+
+
+@pytest.fixture(autouse=True)
+def memory_response_cache(monkeypatch):
+    """In-memory response cache instead of diskcache in the user's home"""
+    monkeypatch.setattr(chat_mcp, "_open_response_cache", dict)
+
+
+def _app(
+    supports_streaming: bool = True,
+    supports_streaming_tools: bool = True,
+    tool_calls: int = 1,
+    tool_delay: float = 0.0
+) -> ChatMCPApp:
+    config = ProviderConfig(
+        name="Test", api_key="test", base_url="http://127.0.0.1:9/v1", model="m",
+        supports_streaming=supports_streaming, supports_streaming_tools=supports_streaming_tools
+    )
+    app = ChatMCPApp("test", FakeConfigManager(config))
+    app.use_cache = False
+    app.mcp_client = FakeMCPClient(tool_delay)
+    app.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(tool_calls)))
+    return app
+
+
+@pytest.mark.parametrize("supports_streaming, supports_streaming_tools, expected_streams", [
+    (True, True, [True, True]),
+    # Streams text but not tool calls: tool turn sent whole, final answer streamed
+    (True, False, [False, True]),
+    (False, False, [False, False]),
+], ids=["streaming", "streaming-text-only", "non-streaming"])
+def test_final_answer_streamed_when_provider_streams(
+    capsys, supports_streaming, supports_streaming_tools, expected_streams
+):
+    app = _app(supports_streaming, supports_streaming_tools)
+    asyncio.run(app.process_query("What are the rest limits?"))
+    
+    requests = app.llm_client.client.chat.completions.requests
+    assert [request["stream"] for request in requests] == expected_streams
+    assert "".join(ANSWER) in capsys.readouterr().out
+
+
+def test_tool_calls_of_one_turn_run_concurrently():
+    app = _app(tool_calls=4, tool_delay=0.3)
+    
+    async def timed():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await app.process_query("What are the rest limits?")
+        return loop.time() - started
+    
+    assert asyncio.run(timed()) < 0.9
+    assert [arguments["query"] for _, arguments in app.mcp_client.calls] == [f"rest {i}" for i in range(4)]
+    
+    # Results appended in tool call order, paired with their tool_call_id
+    request = app.llm_client.client.chat.completions.requests[-1]
+    assert [m["tool_call_id"] for m in request["messages"] if m["role"] == "tool"] == [f"c{i}" for i in range(4)]
+
+
+def test_final_answer_served_from_response_cache(capsys):
+    app = _app()
+    app.use_cache = True
+    completions = app.llm_client.client.chat.completions
+    
+    asyncio.run(app.process_query("What are the rest limits?"))
+    assert len(completions.requests) == 2
+    assert len(app._response_cache) == 1
+    
+    # Same query, same tool results: only the tool turn reaches the LLM
+    asyncio.run(app.process_query("What are the rest limits?"))
+    assert len(completions.requests) == 3
+    out = capsys.readouterr()
+    assert out.out.count("".join(ANSWER)) == 2
+    assert "(cached response)" in out.err
+
+
+@pytest.mark.parametrize("content, count, expected", [
+    ('{"answers": [{"id": 1, "answer": "a"}, {"id": 2, "answer": "b"}]}', 2, ["a", "b"]),
+    # Prose and code fences around the object, ids out of order, one item missing
+    ('Here you go:\n```json\n{"answers": [{"id": 3, "answer": "c"}, {"id": 1, "answer": "a"}]}\n```', 3, ["a", "", "c"]),
+    ('{"answers": [{"id": "2", "answer": 42}]}', 2, ["", "42"]),
+    # Not JSON: a single item keeps the raw text, several items get empty answers
+    ("Rest periods are defined in ORO.FTL.235.", 1, ["Rest periods are defined in ORO.FTL.235."]),
+    ("Rest periods are defined in ORO.FTL.235.", 2, ["", ""]),
+    ('{"answers": [{"answer": "no id"}]}', 1, ['{"answers": [{"answer": "no id"}]}']),
+], ids=["plain", "fenced", "string-id", "text-single", "text-several", "missing-id"])
+def test_parse_batch_answers(content, count, expected):
+    assert ChatMCPApp._parse_batch_answers(None, content, count) == expected
+
+
+def test_process_batch_maps_answers_back_to_queries():
+    app = _app()
+    queries = [f"question {i}" for i in range(5)]
+    
+    async def create(**kwargs):
+        # Answer the numbered items of the prompt in reverse order
+        prompt = kwargs["messages"][-1]["content"]
+        ids = [int(line[1:line.index("]")]) for line in prompt.splitlines() if line.startswith("[")]
+        answers = [{"id": i, "answer": f"answer {i}"} for i in reversed(ids)]
+        message = SimpleNamespace(content=chat_mcp._dumps({"answers": answers}), tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    app.llm_client.client.chat.completions.create = create
+    answers = asyncio.run(app.process_batch(queries, batch_size=2))
+    assert answers == ["answer 1", "answer 2", "answer 1", "answer 2", "answer 1"]
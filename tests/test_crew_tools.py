@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP tool-call plumbing of compliance_crew.py.
+
+CrewAI tools run in worker threads and hand their calls to a dispatcher task
+on the main event loop; a fake MCP client records the calls it receives.
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import compliance_crew
+
+ROOT = Path(__file__).resolve().parent.parent
+
+class FakeClient:
+    """MCP client stub: per-tool delay, records every call it serves."""
+    
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+    
+    async def call_tool(self, tool_name, arguments):
+        self.calls.append((tool_name, arguments))
+        await asyncio.sleep(self.delays.get(tool_name, 0.05))
+        if tool_name == "broken":
+            raise ValueError("tool failed")
+        return f"{tool_name}:{sorted(arguments.items())}"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    compliance_crew.clear_tool_cache()
+    yield
+    compliance_crew.clear_tool_cache()
+
+
+async def _run_calls(client, calls):
+    """Run (tool_name, kwargs) calls concurrently from worker threads, like CrewAI does."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    worker = asyncio.create_task(compliance_crew._mcp_dispatcher(client, queue))
+    call = compliance_crew._make_call(loop, queue)
+    try:
+        return await asyncio.gather(*(asyncio.to_thread(call, name, **kwargs) for name, kwargs in calls))
+    finally:
+        worker.cancel()
+
+
+def test_dispatcher_does_not_block_on_slow_calls():
+    """A slow tool call does not hold back calls queued after it."""
+    client = FakeClient(delays={"slow": 1.0, "fast": 0.01})
+    
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        worker = asyncio.create_task(compliance_crew._mcp_dispatcher(client, queue))
+        call = compliance_crew._make_call(loop, queue)
+        try:
+            slow = asyncio.create_task(asyncio.to_thread(call, "slow"))
+            await asyncio.sleep(0.1)  # slow call already running
+            started = loop.time()
+            assert await asyncio.to_thread(call, "fast") == "fast:[]"
+            assert loop.time() - started < 0.5
+            assert not slow.done()
+            assert await slow == "slow:[]"
+        finally:
+            worker.cancel()
+    
+    asyncio.run(scenario())
+
+
+def test_dispatcher_runs_queued_calls_concurrently():
+    """Distinct calls queued together overlap instead of running one after another."""
+    client = FakeClient(delays={"search": 0.3})
+    calls = [("search", {"query": str(i)}) for i in range(5)]
+    
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        results = await _run_calls(client, calls)
+        return results, asyncio.get_running_loop().time() - started
+    
+    results, elapsed = asyncio.run(scenario())
+    assert results == [f"search:[('query', '{i}')]" for i in range(5)]
+    assert elapsed < 1.0
+
+
+def test_tool_cache_key_ignores_argument_order():
+    key = compliance_crew._tool_cache_key
+    assert key("search", {"query": "rest", "top_k": 5}) == key("search", {"top_k": 5, "query": "rest"})
+    assert key("search", {"query": "rest"}) != key("get_regulation", {"query": "rest"})
+    assert key("search", {"top_k": 5}) != key("search", {"top_k": 6})
+
+
+def test_tool_cache_key_digests_long_text():
+    key = compliance_crew._tool_cache_key
+    long_text = "x" * (compliance_crew.TOOL_CACHE_HASH_THRESHOLD + 1)
+    
+    digested = key("validate_compliance", {"text": long_text})
+    assert long_text not in digested[1][0]
+    assert digested == key("validate_compliance", {"text": long_text})
+    assert digested != key("validate_compliance", {"text": long_text + "y"})
+    
+    # Short text is kept as is
+    assert key("search", {"query": "rest"}) == ("search", (("query", "rest"),))
+
+
+def test_concurrent_identical_calls_share_one_request():
+    client = FakeClient(delays={"search": 0.3})
+    calls = [("search", {"query": str(i % 3)}) for i in range(9)]
+    
+    results = asyncio.run(_run_calls(client, calls))
+    assert len(client.calls) == 3
+    assert results == [f"search:[('query', '{i % 3}')]" for i in range(9)]
+    assert not compliance_crew._tool_inflight
+    
+    # Completed calls are served from the cache
+    asyncio.run(_run_calls(client, calls[:3]))
+    assert len(client.calls) == 3
+
+
+def test_failed_calls_are_shared_but_not_cached():
+    client = FakeClient(delays={"broken": 0.2})
+    
+    results = asyncio.run(_run_calls(client, [("broken", {})] * 3))
+    assert len(client.calls) == 1
+    assert all(json.loads(result) == {"error": "ValueError: tool failed"} for result in results)
+    
+    asyncio.run(_run_calls(client, [("broken", {})]))
+    assert len(client.calls) == 2
+
+
+def test_tool_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(compliance_crew, "TOOL_CACHE_SIZE", 2)
+    client = FakeClient(delays={"search": 0})
+    
+    async def sequence():
+        for query in ("a", "b", "a", "c", "a", "b"):
+            await _run_calls(client, [("search", {"query": query})])
+    
+    asyncio.run(sequence())
+    # "a" stays cached (recently used); "b" was evicted by "c", so it is fetched again
+    assert [arguments["query"] for _, arguments in client.calls] == ["a", "b", "c", "b"]
+
+
+def test_import_does_not_load_heavy_dependencies():
+    """CrewAI and the MCP SDK are imported on first use, not with the module."""
+    code = (
+        "import sys, compliance_crew; "
+        "print(sorted(m for m in ('crewai', 'mcp', 'litellm') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
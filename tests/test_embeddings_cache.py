@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests des caches d'EmbeddingsManager (matrice d'embeddings du scan, cache de requêtes).
+
+Le modèle sentence-transformers est remplacé par un encodeur déterministe :
+ces tests ne téléchargent rien et ne vérifient que la logique de cache.
+"""
+
+import sqlite3
+import zlib
+
+import numpy as np
+import pytest
+
+from easacompliance.embeddings import EmbeddingsManager, EMBEDDING_DTYPE
+from easacompliance.parser import Topic, TopicType
+
+DIM = 384  # dimension connue de all-MiniLM-L6-v2 (modèle par défaut)
+
+
+def _unit(seed: int) -> np.ndarray:
+    """Vecteur unitaire pseudo-aléatoire reproductible"""
+    vector = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeModel:
+    """Encodeur déterministe : vecteur imposé pour certains textes, sinon dérivé du texte"""
+    
+    def __init__(self):
+        self.vectors = {}
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIM
+    
+    def vector(self, text: str) -> np.ndarray:
+        if text not in self.vectors:
+            self.vectors[text] = _unit(zlib.crc32(text.encode()))
+        return self.vectors[text]
+    
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        if isinstance(texts, str):
+            return self.vector(texts)
+        return np.stack([self.vector(text) for text in texts])
+
+
+def _topic(reference: str, content: str) -> Topic:
+    return Topic(
+        reference=reference,
+        title=f"Title {reference}",
+        erules_id=reference,
+        sdt_id="",
+        content=content,
+        topic_type=TopicType.IR,
+    )
+
+
+def _manager(db_path, use_vec: bool, monkeypatch, **kwargs) -> EmbeddingsManager:
+    if not use_vec:
+        monkeypatch.setattr(EmbeddingsManager, "_load_vec_extension", staticmethod(lambda conn: False))
+    manager = EmbeddingsManager(db_path=str(db_path), **kwargs)
+    # cached_property : le modèle factice remplace le chargement de sentence-transformers
+    manager.__dict__["model"] = FakeModel()
+    return manager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "easa_test.db"
+
+
+def _insert_externally(db_path, manager: EmbeddingsManager, reference: str, vector: np.ndarray):
+    """Écriture brute par une autre connexion, sans passer par le gestionnaire"""
+    full_text = _topic(reference, "new").get_full_text()
+    manager.model.vectors[full_text] = vector
+    other = sqlite3.connect(str(db_path))
+    with other:
+        paragraph_id = other.execute("""
+            INSERT INTO paragraphs (reference, title, content, full_text, paragraph_type, category, metadata)
+            VALUES (?, ?, 'new', ?, ?, 'ORO.FTL', '{}')
+        """, (reference, f"Title {reference}", full_text, TopicType.IR.value)).lastrowid
+        other.execute(
+            "INSERT INTO embeddings (paragraph_id, embedding, model_name, dtype) VALUES (?, ?, ?, ?)",
+            (paragraph_id, vector.astype(EMBEDDING_DTYPE).tobytes(), "fake", EMBEDDING_DTYPE)
+        )
+    other.close()
+
+
+@pytest.mark.parametrize("query_cache_ttl", [0, 3600])
+def test_search_sees_rows_written_by_another_connection(db_path, monkeypatch, query_cache_ttl):
+    """Matrice et cache de requêtes sont invalidés après une écriture externe (ex: build_embeddings.py)"""
+    server = _manager(db_path, use_vec=False, monkeypatch=monkeypatch, query_cache_ttl=query_cache_ttl)
+    server.add_paragraphs_batch(
+        [_topic(f"ORO.FTL.{i}", f"content {i}") for i in range(1, 6)], show_progress=False
+    )
+    query = "night duty limits"
+    assert server.search(query, top_k=1)[0].reference != "ORO.FTL.999"
+    
+    # Nouveau paragraphe identique à la requête
+    _insert_externally(db_path, server, "ORO.FTL.999", server.model.vector(query))
+    
+    assert server.search(query, top_k=1)[0].reference == "ORO.FTL.999"
+    server.close()
+
+
+def _rotated(vector: np.ndarray, similarity: float, seed: int) -> np.ndarray:
+    """Vecteur unitaire de similarité cosinus imposée avec `vector`"""
+    other = _unit(seed)
+    orthogonal = other - np.dot(other, vector) * vector
+    orthogonal /= np.linalg.norm(orthogonal)
+    return similarity * vector + np.sqrt(1.0 - similarity ** 2) * orthogonal
+
+
+@pytest.fixture(params=[False, True], ids=["scan", "sqlite-vec"])
+def cached(request, db_path, monkeypatch):
+    """Gestionnaire avec cache de requêtes ; compte les recherches réellement exécutées"""
+    manager = _manager(db_path, use_vec=request.param, monkeypatch=monkeypatch, query_cache_ttl=3600)
+    if request.param and not manager._vec_enabled:
+        pytest.skip("sqlite-vec indisponible")
+    manager.add_paragraphs_batch(
+        [_topic(f"ORO.FTL.{i}", f"content {i}") for i in range(1, 6)], show_progress=False
+    )
+    
+    manager.searches = 0
+    search_embedding = manager._search_embedding
+    
+    def counting(*args, **kwargs):
+        manager.searches += 1
+        return search_embedding(*args, **kwargs)
+    
+    manager._search_embedding = counting
+    yield manager
+    manager.close()
+
+
+def test_query_cache_hit_for_similar_query(cached):
+    """Une requête à similarité >= 0.97 d'une requête en cache réutilise ses résultats"""
+    base = cached.model.vector("rest period")
+    cached.model.vectors["rest periods"] = _rotated(base, 0.99, seed=1)
+    cached.model.vectors["standby duty"] = _rotated(base, 0.90, seed=2)
+    
+    first = cached.search("rest period", top_k=3)
+    assert cached.search("rest periods", top_k=3) == first
+    assert cached.searches == 1
+    
+    # Sous le seuil : nouvelle recherche
+    cached.search("standby duty", top_k=3)
+    assert cached.searches == 2
+
+
+@pytest.mark.parametrize("params", [
+    {"top_k": 2},
+    {"category_filter": "ORO.FTL"},
+    {"min_score": 0.5},
+], ids=["top_k", "category_filter", "min_score"])
+def test_query_cache_miss_when_parameters_differ(cached, params):
+    """Les paramètres de recherche font partie de la clé du cache"""
+    cached.search("rest period", top_k=3)
+    cached.search("rest period", **{"top_k": 3, **params})
+    assert cached.searches == 2
+
+
+def test_query_cache_entries_expire(cached, monkeypatch):
+    """Au-delà du TTL, une entrée n'est plus servie"""
+    clock = [1_000_000.0]
+    monkeypatch.setattr("easacompliance.embeddings.time.time", lambda: clock[0])
+    
+    cached.search("rest period")
+    clock[0] += cached.query_cache_ttl - 1
+    cached.search("rest period")
+    assert cached.searches == 1
+    
+    clock[0] += 2
+    cached.search("rest period")
+    assert cached.searches == 2
+
+
+def test_query_cache_evicts_oldest_entries(cached, monkeypatch):
+    """Au-delà de QUERY_CACHE_MAX_ENTRIES, les entrées les plus anciennes sont évincées"""
+    monkeypatch.setattr("easacompliance.embeddings.QUERY_CACHE_MAX_ENTRIES", 3)
+    
+    for i in range(5):
+        cached.search(f"query {i}")
+    assert cached._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0] == 3
+    if cached._vec_enabled:
+        assert cached._conn.execute("SELECT COUNT(*) FROM vec_query_cache").fetchone()[0] == 3
+    
+    cached.search("query 4")
+    assert cached.searches == 5
+    cached.search("query 0")
+    assert cached.searches == 6
+
+
+def test_query_cache_invalidated_by_add_paragraphs_batch(cached):
+    """Un ajout de paragraphes vide le cache : les résultats incluent le nouveau paragraphe"""
+    query = "rest period"
+    assert cached.search(query, top_k=1)[0].reference != "ORO.FTL.999"
+    
+    topic = _topic("ORO.FTL.999", "rest")
+    cached.model.vectors[topic.get_full_text()] = cached.model.vector(query)
+    cached.add_paragraphs_batch([topic], show_progress=False)
+    
+    assert cached.search(query, top_k=1)[0].reference == "ORO.FTL.999"
+    assert cached.searches == 2
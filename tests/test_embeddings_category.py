@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests de la catégorie enregistrée avec chaque paragraphe.
+
+add_paragraph et add_paragraphs_batch doivent donner la même catégorie,
+sinon les filtres par catégorie de search() dépendent du chemin d'insertion.
+"""
+
+from .test_embeddings_cache import _manager, _topic
+
+REFERENCES = ["ORO.FTL.110", "ORO.FTL.235.A", "CAT.OP.MPA.150", "ARO"]
+
+
+def _categories(manager):
+    return dict(manager._conn.execute("SELECT reference, category FROM paragraphs"))
+
+
+def test_single_and_batch_inserts_store_the_same_category(tmp_path, monkeypatch):
+    single = _manager(tmp_path / "single.db", use_vec=False, monkeypatch=monkeypatch)
+    batch = _manager(tmp_path / "batch.db", use_vec=False, monkeypatch=monkeypatch)
+    topics = [_topic(reference, f"content {reference}") for reference in REFERENCES]
+    
+    for topic in topics:
+        single.add_paragraph(topic)
+    batch.add_paragraphs_batch(topics, show_progress=False)
+    
+    assert _categories(single) == _categories(batch) == {
+        "ORO.FTL.110": "ORO.FTL",
+        "ORO.FTL.235.A": "ORO.FTL",
+        "CAT.OP.MPA.150": "CAT.OP",
+        "ARO": "ARO",
+    }
+    
+    # Le filtre par catégorie trouve le paragraphe quel que soit le chemin d'insertion
+    for manager in (single, batch):
+        assert {r.reference for r in manager.search("rest", top_k=10, category_filter="ORO.FTL", min_score=-1.0)} == {
+            "ORO.FTL.110", "ORO.FTL.235.A"
+        }
+        manager.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ouverture en lecture seule d'EmbeddingsManager.
+
+Une base partagée (ex: celle du serveur MCP) doit pouvoir être ouverte pour
+la recherche sans que le fichier soit modifié (schéma, migration, WAL, cache).
+"""
+
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from easacompliance.embeddings import EmbeddingsManager
+from easacompliance.parser import TopicType
+
+from .test_embeddings_cache import FakeModel, _unit
+
+REFERENCES = [f"ORO.FTL.{i}" for i in range(1, 6)]
+
+
+def _digest(path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Base au schéma d'origine (sans colonne dtype ni cache de requêtes), journal DELETE"""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(path))
+    with conn:
+        conn.executescript("""
+            CREATE TABLE paragraphs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reference TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                full_text TEXT NOT NULL,
+                paragraph_type TEXT NOT NULL,
+                category TEXT,
+                metadata TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE embeddings (
+                id INTEGER PRIMARY KEY,
+                paragraph_id INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                model_name TEXT NOT NULL,
+                FOREIGN KEY (paragraph_id) REFERENCES paragraphs(id)
+            );
+        """)
+        for i, reference in enumerate(REFERENCES, 1):
+            paragraph_id = conn.execute("""
+                INSERT INTO paragraphs (reference, title, content, full_text, paragraph_type, category, metadata)
+                VALUES (?, ?, ?, ?, ?, 'ORO.FTL', '{}')
+            """, (reference, f"Title {reference}", f"content {i}", f"text {i}", TopicType.IR.value)).lastrowid
+            conn.execute(
+                "INSERT INTO embeddings (paragraph_id, embedding, model_name) VALUES (?, ?, 'fake')",
+                (paragraph_id, _unit(i).tobytes())
+            )
+    conn.close()
+    return path
+
+
+def _open(path, **kwargs) -> EmbeddingsManager:
+    manager = EmbeddingsManager(db_path=str(path), **kwargs)
+    manager.__dict__["model"] = FakeModel()
+    return manager
+
+
+def test_read_only_open_does_not_modify_the_file(legacy_db):
+    before = _digest(legacy_db)
+    manager = _open(legacy_db, read_only=True, query_cache_ttl=3600)
+    
+    # Requête identique au 3e paragraphe
+    manager.model.vectors["rest"] = _unit(3)
+    results = manager.search("rest", top_k=2)
+    assert results[0].reference == "ORO.FTL.3"
+    assert results[0].score == pytest.approx(1.0, abs=1e-5)
+    assert manager.query_cache_ttl == 0
+    manager.close()
+    
+    assert _digest(legacy_db) == before
+    assert not os.path.exists(f"{legacy_db}-wal")
+    conn = sqlite3.connect(str(legacy_db))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert "dtype" not in {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+    conn.close()
+
+
+def test_read_only_manager_rejects_writes(legacy_db):
+    manager = _open(legacy_db, read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        manager.clear_database()
+    manager.close()
+
+
+def test_read_only_manager_sees_writes_from_a_writer(legacy_db):
+    reader = _open(legacy_db, read_only=True)
+    writer = _open(legacy_db)  # migre la base (colonne dtype, WAL)
+    reader.model.vectors["duty"] = _unit(42)
+    assert reader.search("duty", top_k=1)[0].reference != "ORO.FTL.42"
+    
+    conn = sqlite3.connect(str(legacy_db))
+    with conn:
+        paragraph_id = conn.execute("""
+            INSERT INTO paragraphs (reference, title, content, full_text, paragraph_type, category, metadata)
+            VALUES ('ORO.FTL.42', 'Title', 'content', 'text', ?, 'ORO.FTL', '{}')
+        """, (TopicType.IR.value,)).lastrowid
+        conn.execute(
+            "INSERT INTO embeddings (paragraph_id, embedding, model_name, dtype) VALUES (?, ?, 'fake', 'float32')",
+            (paragraph_id, _unit(42).tobytes())
+        )
+    conn.close()
+    
+    assert reader.search("duty", top_k=1)[0].reference == "ORO.FTL.42"
+    reader.close()
+    writer.close()
+
+
+@pytest.mark.skipif(os.name != "posix" or os.geteuid() == 0, reason="droits de fichier POSIX, hors root")
+def test_unwritable_file_falls_back_to_read_only(legacy_db):
+    before = _digest(legacy_db)
+    legacy_db.chmod(0o444)
+    legacy_db.parent.chmod(0o555)
+    try:
+        manager = _open(legacy_db, query_cache_ttl=3600)
+        assert manager.read_only
+        manager.model.vectors["rest"] = _unit(2)
+        assert manager.search("rest", top_k=1)[0].reference == "ORO.FTL.2"
+        manager.close()
+    finally:
+        legacy_db.parent.chmod(0o755)
+        legacy_db.chmod(0o644)
+    assert _digest(legacy_db) == before
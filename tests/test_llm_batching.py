@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the lifecycle of the micro-batching LLM clients.
+
+The batcher runs its own event-loop thread: it must stop with the client,
+and callers must not wait forever on it.
+"""
+
+import asyncio
+import gc
+import json
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("httpx")
+
+from easacompliance.llm import OllamaLLM
+from easacompliance.llm._batching import _PromptBatcher
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """chat/completions stub answering after `delay` seconds."""
+    
+    delay = 0.0
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(type(self).delay)
+        reply = json.dumps({"choices": [{"message": {"role": "assistant", "content": "ok"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+
+@pytest.fixture
+def endpoint():
+    _SlowHandler.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_batcher_thread_stops_when_client_is_collected(endpoint):
+    llm = OllamaLLM(model="m", base_url=endpoint, batch_window_ms=5)
+    assert llm.call("hello") == "ok"
+    thread = llm._batcher._thread
+    assert thread.is_alive()
+    
+    del llm
+    gc.collect()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+def test_batched_call_times_out_instead_of_hanging(endpoint):
+    _SlowHandler.delay = 2.0
+    llm = OllamaLLM(model="m", base_url=endpoint, batch_window_ms=5)
+    llm._batch_call_timeout = 0.3
+    try:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            llm.call("hello")
+        assert time.monotonic() - started < 1.5
+    finally:
+        llm.close()
+
+
+def test_batcher_run_times_out():
+    async def dispatch(payloads):
+        return payloads
+    
+    async def never():
+        await asyncio.Event().wait()
+    
+    batcher = _PromptBatcher(dispatch)
+    try:
+        with pytest.raises(FutureTimeoutError):
+            batcher.run(never(), timeout=0.1)
+    finally:
+        batcher.close()
+    assert not batcher._thread.is_alive()
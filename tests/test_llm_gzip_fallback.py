@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the gzip request-body fallback of the custom LLM clients.
+
+A local stub server plays an OpenAI-compatible endpoint that does not
+decode compressed request bodies and answers 400 to them.
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("crewai")
+pytest.importorskip("httpx")
+
+from easacompliance.llm import OllamaLLM
+from easacompliance.llm import _openai_compat
+
+
+class _NoGzipHandler(BaseHTTPRequestHandler):
+    """chat/completions stub: 400 on gzip bodies, echo of the prompt length otherwise."""
+    
+    requests_seen = []
+    gzip_error = "invalid JSON body"
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        encoding = self.headers.get("Content-Encoding")
+        type(self).requests_seen.append(encoding)
+        
+        if encoding == "gzip":
+            reply = json.dumps({"error": {"message": type(self).gzip_error}}).encode()
+            self.send_response(400)
+        else:
+            prompt = json.loads(body)["messages"][-1]["content"]
+            reply = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": f"ok {len(prompt)}"}}]
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+
+@pytest.fixture
+def endpoint():
+    _NoGzipHandler.requests_seen = []
+    _NoGzipHandler.gzip_error = "invalid JSON body"
+    _openai_compat._gzip_refused.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NoGzipHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+    _openai_compat._gzip_refused.clear()
+
+
+BIG_PROMPT = "x" * (_openai_compat.GZIP_MIN_BYTES * 2)
+
+
+def test_compression_is_off_by_default(endpoint):
+    llm = OllamaLLM(model="m", base_url=endpoint)
+    try:
+        assert llm.call(BIG_PROMPT) == f"ok {len(BIG_PROMPT)}"
+        assert _NoGzipHandler.requests_seen == [None]
+    finally:
+        llm.close()
+
+
+def test_sync_call_resends_uncompressed_after_400(endpoint):
+    llm = OllamaLLM(model="m", base_url=endpoint, compress_requests=True)
+    try:
+        assert llm.call(BIG_PROMPT) == f"ok {len(BIG_PROMPT)}"
+        assert _NoGzipHandler.requests_seen == ["gzip", None]
+        assert llm.endpoint in _openai_compat._gzip_refused
+        
+        # The endpoint is remembered: no second compressed attempt
+        assert llm.call(BIG_PROMPT) == f"ok {len(BIG_PROMPT)}"
+        assert _NoGzipHandler.requests_seen == ["gzip", None, None]
+    finally:
+        llm.close()
+
+
+def test_async_call_resends_uncompressed_after_400(endpoint):
+    llm = OllamaLLM(model="m", base_url=endpoint, compress_requests=True)
+    try:
+        assert asyncio.run(llm.acall(BIG_PROMPT)) == f"ok {len(BIG_PROMPT)}"
+        assert _NoGzipHandler.requests_seen == ["gzip", None]
+        assert llm.endpoint in _openai_compat._gzip_refused
+    finally:
+        llm.close()
+
+
+UNRELATED_400 = "This model's maximum context length is 8192 tokens"
+
+
+def test_sync_call_does_not_resend_on_unrelated_400(endpoint):
+    _NoGzipHandler.gzip_error = UNRELATED_400
+    llm = OllamaLLM(model="m", base_url=endpoint, compress_requests=True)
+    try:
+        with pytest.raises(Exception):
+            llm.call(BIG_PROMPT)
+        assert _NoGzipHandler.requests_seen == ["gzip"]
+        assert llm.endpoint not in _openai_compat._gzip_refused
+    finally:
+        llm.close()
+
+
+def test_async_call_does_not_resend_on_unrelated_400(endpoint):
+    _NoGzipHandler.gzip_error = UNRELATED_400
+    llm = OllamaLLM(model="m", base_url=endpoint, compress_requests=True)
+    try:
+        with pytest.raises(Exception):
+            asyncio.run(llm.acall(BIG_PROMPT))
+        assert _NoGzipHandler.requests_seen == ["gzip"]
+        assert llm.endpoint not in _openai_compat._gzip_refused
+    finally:
+        llm.close()
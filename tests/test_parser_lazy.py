@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests du chargement paresseux des contenus SDT (EASAParser(..., preload_content=False)).
+
+Un petit document « flat OPC » est généré : partie /word/document.xml avec les
+contenus SDT, partie /customXml/item*.xml avec la TOC eRules.
+"""
+
+import pytest
+
+from easacompliance.parser import EASAParser
+
+PKG = EASAParser.NS_PKG.strip('{}')
+ER = EASAParser.NS_ER.strip('{}')
+W = EASAParser.NS_W.strip('{}')
+
+TOPICS = [
+    # (sdt-id, source-title, TypeOfContent, RegulatorySubject, contenu)
+    ("-101", "ORO.FTL.105 Definitions", "IR (Implementing rule);", "Part-ORO",
+     ["For the purpose of this Subpart:", "'acclimatised' means a state..."]),
+    ("-102", "AMC1 ORO.FTL.110 Operator responsibilities",
+     "AMC to IR (Acceptable means of compliance to implementing rule);", "Part-ORO",
+     ["SCHEDULING", "The operator should publish duty rosters."]),
+    ("-103", "GM1 ORO.FTL.110(a) Operator responsibilities",
+     "GM to IR (Guidance material to implementing rule);", "Part-ORO",
+     ["Rosters & <published> schedules"]),
+    ("-104", "CS FTL.1.200 Home base", "CS (Certification specification);", "Part-ORO",
+     ["The home base is a single airport location."]),
+    ("-105", "Article 2 - Definitions", "IR (Implementing rule);", "Regulation (EU) No 965/2012",
+     ["For the purpose of this Regulation:"]),
+    # Topic sans contenu SDT dans le document
+    ("-999", "SPA.LVO.100 Low visibility operations", "IR (Implementing rule);", "Part-SPA", []),
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _write_document(path):
+    sdts = "".join(
+        f'<w:sdt><w:sdtPr><w:id w:val="{sdt_id}"/></w:sdtPr><w:sdtContent>'
+        + "".join(f"<w:p><w:r><w:t>{_escape(line)}</w:t></w:r></w:p>" for line in lines)
+        + "</w:sdtContent></w:sdt>"
+        for sdt_id, _, _, _, lines in TOPICS if lines
+    )
+    topics = "".join(
+        f'<er:topic source-title="{_escape(title)}" ERulesId="ER{sdt_id}" TypeOfContent="{_escape(kind)}" '
+        f'RegulatorySubject="{_escape(subject)}" RegulatorySource="Regulation (EU) No 83/2014" '
+        f'ApplicabilityDate="2014-02-18" EntryIntoForceDate="2014-02-18" Keywords="ftl" sdt-id="{sdt_id}"/>'
+        for sdt_id, title, kind, subject, _ in TOPICS
+    )
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<pkg:package xmlns:pkg="{PKG}">'
+        '<pkg:part pkg:name="/word/document.xml"><pkg:xmlData>'
+        f'<w:document xmlns:w="{W}"><w:body>{sdts}</w:body></w:document>'
+        '</pkg:xmlData></pkg:part>'
+        '<pkg:part pkg:name="/customXml/item1.xml"><pkg:xmlData>'
+        f'<er:document xmlns:er="{ER}" source-title="Easy Access Rules"><er:toc>'
+        f'<er:heading title="Subpart FTL" sdt-id="h">{topics}</er:heading>'
+        '</er:toc></er:document>'
+        '</pkg:xmlData></pkg:part>'
+        '</pkg:package>',
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def xml_path(tmp_path):
+    return str(_write_document(tmp_path / "easa.xml"))
+
+
+def test_lazy_parser_defers_sdt_index(xml_path):
+    """Sans préchargement, l'index des contenus n'est construit qu'au premier accès"""
+    parser = EASAParser(xml_path, preload_content=False)
+    assert not parser._sdt_indexed
+    
+    # Statistiques : structure de la TOC seulement
+    parser.get_statistics()
+    assert not parser._sdt_indexed
+    
+    topic = parser.get_topic_by_reference("ORO.FTL.105")
+    assert parser._sdt_indexed
+    assert "acclimatised" in topic.content
+
+
+def test_lazy_and_eager_parsers_yield_identical_topics(xml_path):
+    """Chargement paresseux et préchargement produisent exactement les mêmes topics"""
+    eager = EASAParser(xml_path)
+    lazy = EASAParser(xml_path, preload_content=False)
+    
+    assert lazy.get_statistics() == eager.get_statistics()
+    
+    eager_topics = [topic.to_dict() for topic in eager.get_all_topics()]
+    lazy_topics = [topic.to_dict() for topic in lazy.get_all_topics()]
+    assert lazy_topics == eager_topics
+    assert len(eager_topics) == len(TOPICS)
+    assert sum(1 for topic in eager_topics if topic["content"]) == len(TOPICS) - 1
+    
+    for reference in ("AMC1 ORO.FTL.110", "GM1 ORO.FTL.110(a)", "CS FTL.1.200", "Article 2"):
+        eager_topic = eager.get_topic_by_reference(reference)
+        assert eager_topic is not None, reference
+        assert lazy.get_topic_by_reference(reference).to_dict() == eager_topic.to_dict()